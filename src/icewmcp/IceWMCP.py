@@ -155,9 +155,12 @@ class controlwin:
 	controlwin.connect("destroy",self.doQuit)
 	controlwin.show_all()
 	try:
-		if not os.path.exists(os.environ["HOME"]+os.sep+".icecp_ignore"):
+		hint_file=os.environ["HOME"]+os.sep+".icecp_ignore"
+		try:
+			open(hint_file).close()  # hint already shown once
+		except IOError:
 			msg_info(DIALOG_TITLE,_("HINT: Use SINGLE clicks instead of double-clicks.\nYou will not see this message again."))
-			os.popen("touch "+os.environ["HOME"]+os.sep+".icecp_ignore")
+			open(hint_file,"a").close()  # create the marker ourselves, no 'touch' needed
 	except:
 		pass
 
@@ -525,9 +528,8 @@ class controlwin:
 	# Will only load special fonts if the applets for this locale are there...
 	if len(glob.glob(APPLET_DIRECTORY+getLocaleDir()+"*.cpl"))>0: 
 		APPLET_DIRECTORY=APPLET_DIRECTORY+getLocaleDir()
-		if special_fonts_map.has_key(mylocale):
-			font1=special_fonts_map[mylocale][0]
-			font2=special_fonts_map[mylocale][1]
+		special_fonts=special_fonts_map.get(mylocale)
+		if special_fonts: font1,font2=special_fonts
 
 	p=loadScaledImage(getBaseDir()+"applet-icons"+os.sep+str(micon),newh,newwidth)
 	if p==None: p=loadScaledImage(getBaseDir()+"applet-icons"+os.sep+"default.xpm",newh,newwidth)
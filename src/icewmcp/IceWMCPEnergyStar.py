@@ -36,6 +36,8 @@
 #	02111-1307, USA.
 #############################################
 
+import subprocess
+
 #set translation support
 from icewmcp_common import *
 
@@ -44,6 +46,32 @@ def _(somestr):
 
 
 
+# (label, seconds) in menu order, shared by every window: each label is
+# translated only once
+ENERGY_TIMES=(
+	(_("NEVER"),0),
+	("5 "+_("minutes"),5*60),
+	("10 "+_("minutes"),10*60),
+	("15 "+_("minutes"),15*60),
+	("20 "+_("minutes"),20*60),
+	("30 "+_("minutes"),30*60),
+	("45 "+_("minutes"),45*60),
+	("1 "+_("hour"),60*60),
+	("1.5 "+_("hours"),90*60),
+	("2 "+_("hours"),120*60),
+	("3 "+_("hours"),180*60),
+	("4 "+_("hours"),240*60),
+	("5 "+_("hours"),300*60),
+	("6 "+_("hours"),360*60),
+	("9 "+_("hours"),540*60),
+	("12 "+_("hours"),720*60),
+	("18 "+_("hours"),1080*60),
+	("24 "+_("hours"),1440*60),
+	)
+ENERGY_TIMES_DICT=dict(ENERGY_TIMES)
+ENERGY_TIME_ORDER=[ii[0] for ii in ENERGY_TIMES]
+
+
 class energywin:
     def __init__(self) :
 	self.version=this_software_version
@@ -94,47 +122,8 @@ class energywin:
 	mainvbox.pack_start(self.onoff,0,0,3)
 	self.onoff.set_active(1)
 
-	self.times={
-		_("NEVER"):0,
-		"5 "+_("minutes"):5*60,
-		"10 "+_("minutes"):10*60,
-		"15 "+_("minutes"):15*60,
-		"20 "+_("minutes"):20*60,
-		"30 "+_("minutes"):30*60,
-		"45 "+_("minutes"):45*60,
-		"1 "+_("hour"):60*60,
-		"1.5 "+_("hours"):90*60,
-		"2 "+_("hours"):120*60,
-		"3 "+_("hours"):180*60,
-		"4 "+_("hours"):240*60,
-		"5 "+_("hours"):300*60,
-		"6 "+_("hours"):360*60,
-		"9 "+_("hours"):540*60,
-		"12 "+_("hours"):720*60,
-		"18 "+_("hours"):1080*60,
-		"24 "+_("hours"):1440*60,
-				}
-
-	timeorder=[
-		_("NEVER"),
-		"5 "+_("minutes"),
-		"10 "+_("minutes"),
-		"15 "+_("minutes"),
-		"20 "+_("minutes"),
-		"30 "+_("minutes"),
-		"45 "+_("minutes"),
-		"1 "+_("hour"),
-		"1.5 "+_("hours"),
-		"2 "+_("hours"),
-		"3 "+_("hours"),
-		"4 "+_("hours"),
-		"5 "+_("hours"),
-		"6 "+_("hours"),
-		"9 "+_("hours"),
-		"12 "+_("hours"),
-		"18 "+_("hours"),
-		"24 "+_("hours"),
-				]
+	self.times=ENERGY_TIMES_DICT
+	timeorder=ENERGY_TIME_ORDER
 
 	self.combos=[]
 	dpms=[_("'Standby' after being idle for"),_("Suspend the computer after"),_("Turn the computer off after")]
@@ -171,24 +160,17 @@ class energywin:
 
     def apply_settings(self,*args) :
 	if self.onoff.get_active():
-		# turn Energy Star features on
-		os.popen("xset +dpms")
-
-		standby=0
-		suspend=0
-		compoff=0
-		if self.times.has_key(self.combos[0].entry.get_text()): 
-			standby=self.times[self.combos[0].entry.get_text()]
-		if self.times.has_key(self.combos[1].entry.get_text()): 
-			suspend=self.times[self.combos[1].entry.get_text()]
-		if self.times.has_key(self.combos[2].entry.get_text()): 
-			compoff=self.times[self.combos[2].entry.get_text()]
-		enline="xset dpms "+str(standby)+" "+str(suspend)+" "+str(compoff)
-		#print "CMDLINE:  "+enline
-		os.popen(enline)
-
+		# turn Energy Star features on and set the timeouts with one xset run
+		# standby, suspend, off: one read and one lookup per combo
+		secs=[str(self.times.get(combo.entry.get_text(),0)) for combo in self.combos]
+		enline=["xset","+dpms","dpms"]+secs
+		#print "CMDLINE:  "+" ".join(enline)
 	else:  # turn EnergyStar features off
-		os.popen("xset -dpms")
+		enline=["xset","-dpms"]
+	try:
+		subprocess.Popen(enline)   # xset prints nothing we need, so there is no pipe to read
+	except OSError:   # no 'xset' on this system
+		pass
 
 
     def doQuit(self,*args) :
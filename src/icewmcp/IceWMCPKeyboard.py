@@ -59,7 +59,7 @@
 #	October/November 2003
 #############################
 
-import time
+import time, bisect, re, subprocess
 
 #set translation support
 import icewmcp_common
@@ -70,8 +70,6 @@ def _(somestr):
 
 icewmcp_common.NOSPLASH=1  # disable splash window from icepref_td,icepref
 
-import icepref
-
 global ICE_TAB
 ICE_TAB=None
 global KEY_TAB
@@ -88,9 +86,44 @@ global C_WINDOW
 C_WINDOW=None
 global DO_QUIT
 DO_QUIT=1
+global XSET_PROCS
+XSET_PROCS=[]  # running 'xset' children, reaped by pollXset
+
+# a line of an IceWM 'keys' file:  key "Ctrl+Alt+t"   xterm
+KEY_LINE_RE=re.compile(r'^\s*key\s+"([^"]*)"\s*(.*)$')
+# modifiers that have their own check box in the key editor
+KEY_MODIFIERS=("Ctrl","Alt","Shift")
+# a real keys file is a few KB, don't hang the editor parsing anything this big
+KEYS_FILE_MAX=1048576
 
 # shared methods
 
+def runXset(settings) :
+	# xset takes any number of options, so a list of saved 'xset ...'
+	# commands goes to the X server in a single run
+	opts=" ".join([ii[5:] for ii in settings if ii]).split()  # strip the leading 'xset '
+	if len(opts)>0:
+		try:
+			# xset prints nothing we need, so don't block the UI waiting on it;
+			# pollXset reaps it later and reports a failed run
+			p=subprocess.Popen(["xset"]+opts)
+		except OSError:  # no 'xset' on this system
+			return
+		if len(XSET_PROCS)==0:
+			timeout_add(200,pollXset)
+		XSET_PROCS.append(p)
+
+def pollXset(*args) :
+	for p in XSET_PROCS[:]:
+		ret=p.poll()
+		if not ret==None:
+			XSET_PROCS.remove(p)
+			if not ret==0:
+				sys.stderr.write("xset exited with status "+str(ret)+"\n")
+	if len(XSET_PROCS)>0:
+		return 1
+	return 0  # nothing left to reap, stop polling
+
 def restart_ice(*args) :
 	global BSD_WARN
 	if not BSD_WARN==1:
@@ -101,10 +134,13 @@ def restart_ice(*args) :
 	global SHORT_TAB
 	global KEY_TAB
 	global BELL_TAB
-	BELL_TAB.doApply()
-	KEY_TAB.doApply()
+	# repeat rate, bell and click all go out in one xset run
+	KEY_TAB.setRate()
+	BELL_TAB.setSound()
+	runXset(KB_SETTINGS)
+	KEY_TAB.last_applied=KB_SETTINGS[0]
 	ICE_TAB.save_current_settings("nowarn")
-	SHORT_TAB.doSave()
+	if not SHORT_TAB.no_save==1: SHORT_TAB.doSave()  # never overwrite a keys file we refused to load
 	#    changed 12.24.2003 - use common Bash shell probing
 	#    to fix BUG NUMBER: 1523884
 	#    Reported By: david ['-at-'] jetnet.co.uk
@@ -124,19 +160,22 @@ def reapplySettings1(*args):
 	#print "reapply"
 	global KB_SETTINGS
 	global DO_QUIT
-	for ii in KB_SETTINGS:  # execute all of our 'saved' settings commands on exit
-		if ii==None: continue
-		if ii.strip()=='': continue
-		#    changed 12.24.2003 - use common Bash shell probing
-		#    to fix BUG NUMBER: 1523884
-		#    Reported By: david ['-at-'] jetnet.co.uk
-		#    Reported At: Fri Oct 31 23:47:12 2003
-		fork_process(ii)
+	global KEY_TAB
+	global BELL_TAB
+	for ii in [KEY_TAB,BELL_TAB]:  # drop applies queued by the widgets being destroyed
+		if not ii==None: ii.cancelApply()
+	runXset(KB_SETTINGS)  # execute all of our 'saved' settings commands on exit
 	if DO_QUIT==1: sys.exit(1)  # better to call sys.exit instead of mainquit in this situation
 
 
 def reapplySettings(*args):
 	global C_WINDOW
+	global KEY_TAB
+	global BELL_TAB
+	# store a change made just before closing, while the widgets still hold
+	# what the user chose; reapplySettings1 then sends it with the rest
+	if not KEY_TAB==None and not KEY_TAB.apply_timer==None: KEY_TAB.setRate()
+	if not BELL_TAB==None and not BELL_TAB.apply_timer==None: BELL_TAB.setSound()
 	try:
 		C_WINDOW.hide()
 		C_WINDOW.destroy()
@@ -151,7 +190,7 @@ def reapplySettings(*args):
 ## Shortcut Key tool - from the old IceWMCPKeyEdit
 ####################################
 class keypanel:
-    def createPanel(self,with_logo=1):
+    def createPanel(self,with_logo=1,load_now=1):
 	mainvbox=VBox(0,2)
 	mainvbox.set_border_width(5)
 	mainvbox.set_spacing(4)
@@ -216,6 +255,9 @@ class keypanel:
 	self.setb=setb
 	self.delb=delb
 	self.testb=testb
+	# widgets for typing a new key, and buttons that act on the selected key
+	self.new_key_widgets=(self.keyentry,self.alt,self.shift,self.ctrl,addb)
+	self.row_widgets=(delb,setb,testb)
 	buttbox.pack_start(newb,1,1,0)
 	buttbox.pack_start(setb,1,1,0)
 	buttbox.pack_start(addb,1,1,0)
@@ -237,7 +279,8 @@ class keypanel:
 	mainvbox.pack_start(self.status,0,0,2)	
 	self.clist.connect('select_row', self.clist_cb)
 	self.clist.connect('unselect_row', self.new_key1)
-	self.loadUp()
+	if load_now==1: self.loadUp()
+	else: self.show_keys({})  # empty until the caller runs loadUp()
 	return mainvbox	
 
     def __init__(self,noclose=0,start_pref_file=None) :
@@ -254,6 +297,8 @@ class keypanel:
 	if not start_pref_file==None:
 		self.preffile=start_pref_file
 	self.lastprog=""
+	self.last_found=None  # the executable the last 'Test Key' found
+	self.no_save=0  # set when preffile was too big to load, so saving must not overwrite it
 
     def createWindow(self):
 	global WMCLASS
@@ -308,9 +353,15 @@ class keypanel:
 	wallwin.show_all()
 
     def loadUp(self,*args) :
+	self.show_keys(self.get_keys())
+	return 0  # run once when called from idle_add
+
+    def show_keys(self,key_dict) :
 	self.current_row=-1
 	self.current_key=None
-	self.mykeys=self.get_keys()
+	self.mykeys=key_dict
+	self.keylist=self.mykeys.keys()  # key names in row order, kept sorted as keys come and go
+	self.keylist.sort()
 	self.display_keys(self.mykeys)
 	self.new_key()
 	if len(self.mykeys.keys())>0:
@@ -346,16 +397,15 @@ class keypanel:
 	if not len(self.progentry.get_text().strip())>0:
 		msg_warn(DIALOG_TITLE,_("You must specify a program for this key combination"))	
 		return
+	prog=self.progentry.get_text().strip()
+	self.mykeys[self.current_key]=prog
+	row=self.key_row(self.current_key)
 	self.clist.freeze()
-	self.mykeys[self.current_key]=self.progentry.get_text().strip()
-	self.display_keys(self.mykeys)
-	self.new_key(1)
+	self.clist.set_text(row,1,prog)  # only this row changed, the selection stays as it is
+	self.clist.set_row_data(row,[self.current_key,prog])
 	self.setStatus(_("Modified."))
 	try:
-		l=self.mykeys.keys()
-		l.sort()
-		self.clist.select_row(l.index(self.current_key),0)
-		self.clist.moveto(l.index(self.current_key),0,0,0)
+		self.clist.moveto(row,0,0,0)
 	except:
 		pass
 	self.clist.thaw()
@@ -369,42 +419,44 @@ class keypanel:
 	if self.mykeys.has_key(s):
 		msg_warn(DIALOG_TITLE,_("The key '")+s+_("' already exists and\ntriggers the program: ")+self.mykeys[s]+"\n\n"+_("You must either delete the existing key,\nor change the existing key's action using 'Set'."))
 		return
+	prog=self.progentry.get_text().strip()
+	self.mykeys[s]=prog
+	bisect.insort(self.keylist,s)
+	row=self.key_row(s)
 	self.clist.freeze()
-	self.mykeys[s]=self.progentry.get_text().strip()
-	self.display_keys(self.mykeys)
+	self.clist.insert(row,[s,prog])  # insert in sorted place instead of refilling the list
+	self.clist.set_row_data(row,[s,prog])
 	self.setStatus(_("Modified."))
 	try:
-		l=self.mykeys.keys()
-		l.sort()
-		self.clist.select_row(l.index(s),0)
-		self.clist.moveto(l.index(s),0,0,0)
+		self.clist.select_row(row,0)
+		self.clist.moveto(row,0,0,0)
 	except:
 		pass
 	self.clist.thaw()
 
     def del_key(self,*args):
 	if self.current_key==None: return
-	self.clist.thaw()
 	try:
 		if msg_confirm(DIALOG_TITLE,_("Are you sure you want to delete this key?")+"\n\n"+self.current_key+"\n"+self.mykeys[self.current_key])==1:
-
-			l=self.mykeys.keys()
-			l.sort()
-			prev_row=l.index(self.current_key)-1
-
+			row=self.key_row(self.current_key)
 			del self.mykeys[self.current_key]
-			self.display_keys(self.mykeys)
+			del self.keylist[row]
+			self.clist.freeze()
+			self.clist.remove(row)  # drop just this row
 			self.new_key(0)
 			self.current_key=None
 			self.setStatus(_("Modified."))
 			try:
-				self.clist.select_row(prev_row,0)
-				self.clist.moveto(prev_row,0,0,0)
+				self.clist.select_row(row-1,0)
+				self.clist.moveto(row-1,0,0,0)
 			except:
 				pass
+			self.clist.thaw()
 	except:
 		pass
-	self.clist.freeze()
+
+    def key_row(self,key_name):  # the CList row of a key, rows are kept in sorted key order
+	return bisect.bisect_left(self.keylist,key_name)
 
     def new_key1(self,*args):
 	self.new_key(0)
@@ -419,24 +471,9 @@ class keypanel:
 	self.ctrl.set_active(0)
 	self.shift.set_active(0)
 	self.keyentry.set_text("")
-	if desense==1:
-		self.keyentry.set_sensitive(0)
-		self.alt.set_sensitive(0)
-		self.shift.set_sensitive(0)
-		self.ctrl.set_sensitive(0)
-		self.addb.set_sensitive(0)
-		self.delb.set_sensitive(1)
-		self.setb.set_sensitive(1)
-		self.testb.set_sensitive(1)
-	else:
-		self.keyentry.set_sensitive(1)
-		self.alt.set_sensitive(1)
-		self.shift.set_sensitive(1)
-		self.ctrl.set_sensitive(1)
-		self.addb.set_sensitive(1)
-		self.delb.set_sensitive(0)
-		self.setb.set_sensitive(0)
-		self.testb.set_sensitive(0)
+	for ii in self.new_key_widgets: ii.set_sensitive(desense==0)
+	for ii in self.row_widgets: ii.set_sensitive(desense==1)
+	if not desense==1:
 		self.current_key=None
 
     def clist_cb(self,widget, row, col, event):
@@ -446,29 +483,27 @@ class keypanel:
 	self.progentry.set_text(rowlist[1])
 	ikeys=rowlist[0].split("+")
 	self.current_key=rowlist[0]
+	other_keys=[]
 	for ii in ikeys:
 		if ii=="Ctrl": self.ctrl.set_active(1)
 		elif ii=="Alt": self.alt.set_active(1)
 		elif ii=="Shift": self.shift.set_active(1)
-		else:
-			if  len(self.keyentry.get_text())>0: self.keyentry.set_text(self.keyentry.get_text()+"+"+ii)
-			else: self.keyentry.set_text(ii)
+		else: other_keys.append(ii)
+	self.keyentry.set_text("+".join(other_keys))  # fill the entry once, not once per key
 	
 
     def display_keys(self,key_dict):
-	klist=key_dict.keys()
-	klist.sort()
-	self.clist.freeze()
-	self.clist.clear()	
-	inum=0
+	klist=self.keylist  # the keys of key_dict, already sorted
+	clist=self.clist
+	clist.freeze()  # one redraw for the whole file, at thaw()
+	clist.clear()	
 	for ii in klist:
 		try:
-			self.clist.append([ii,key_dict[ii]])
-			self.clist.set_row_data(inum,[ii,key_dict[ii],inum])
-			inum=inum+1
+			row=[ii,key_dict[ii]]
+			clist.set_row_data(clist.append(row),row)  # append() returns the new row number
 		except:
 			pass
-	self.clist.thaw()
+	clist.thaw()
 		
 
     def parseLineList(self,string_list):
@@ -476,13 +511,11 @@ class keypanel:
 	try:
 		d={}
 		for ii in ff:
-			if not ii.strip().startswith("key "): continue
-			iline=ii[ii.find("key ")+4:len(ii)].strip()
-			if iline.startswith("\""):
-				ikey=iline[0:iline.rfind("\"")+1].strip()
-				iprog=iline.replace(ikey,"").replace("\t","").replace("\t","").replace("\t","").strip()
-				if iprog.find("#")>0: iprog=iprog[0:iprog.find("#")]
-				ikey=ikey.replace("\"","").strip()
+			m=KEY_LINE_RE.match(ii)
+			if m:
+				ikey=m.group(1).strip()
+				iprog=m.group(2).strip()
+				if iprog.find("#")>0: iprog=iprog[0:iprog.find("#")].strip()
 				if (len(ikey)>0) and (len(iprog)>0):
 					keylist=ikey.split("+")
 					arkeys=""
@@ -494,7 +527,7 @@ class keypanel:
 						if len(arkeys)>0: arkeys=arkeys+"+Shift"
 						else: arkeys="Shift"
 					for h in keylist:
-						if h.strip() in ['Alt','Ctrl','Shift']: continue
+						if h.strip() in KEY_MODIFIERS: continue
 						if len(arkeys)>0: arkeys=arkeys+"+"+h.strip()
 						if len(arkeys)==0: arkeys=h.strip()					
 					d[arkeys]=iprog
@@ -502,21 +535,32 @@ class keypanel:
 	except:
 		return {}
 
+    def read_keys(self,file_name,make_backup=1) :  # raises IOError if the file can't be read, ValueError if it is too big
+	f=open(file_name)
+	try:
+		if os.fstat(f.fileno()).st_size>KEYS_FILE_MAX: raise ValueError(file_name)
+		ff=f.read()
+	finally:
+		f.close()
+	if make_backup==1: self.backup(file_name,ff) # create a backup from what we just read
+	return self.parseLineList(ff.splitlines())
+
+    def keys_too_big(self,file_name) :
+	msg_err(DIALOG_TITLE,_("This file is too large to be a key configuration file")+":\n"+file_name)
+
     def get_keys(self,*args) :
+	self.no_save=0
 	try:
 		#print "KEYS:  "+str(self.preffile)
-		self.backup(self.preffile) # create a backup
-		f=open(self.preffile)
-		ff=f.read().split("\n")
-		f.close()
-		return self.parseLineList(ff)
+		return self.read_keys(self.preffile)
+	except ValueError:  # there is a file, it is just too big, so don't load another one in its place
+		self.keys_too_big(self.preffile)
+		self.no_save=1  # and don't let Save replace it with an empty list
+		return {}
 	except:
 		pass
 	try: # this happens if we got an empty prefs file - try system prefs in a universal way, new in version 1.2
-		f=open(getIceWMConfigPath()+"keys")
-		ff=f.read().split("\n")
-		f.close()
-		return self.parseLineList(ff)
+		return self.read_keys(getIceWMConfigPath()+"keys",0)
 	except:
 		pass
 	return {}
@@ -545,12 +589,17 @@ class keypanel:
 		if self.is_prog_select==1:
 			self.progentry.set_text(str(dirvalue))
 		else:
-			if os.path.exists(dirvalue):
-				self.preffile=dirvalue
-				self.loadUp()
-			else:				
+			try:  # just open it, a missing file or a directory fails here
+				key_dict=self.read_keys(dirvalue)
+			except (IOError,OSError):
 				msg_err(DIALOG_TITLE,_("No such file or directory:\n")+dirvalue)	
 				return
+			except ValueError:
+				self.keys_too_big(dirvalue)
+				return
+			self.preffile=dirvalue
+			self.no_save=0
+			self.show_keys(key_dict)
 
     def run_as_root(self, root_bool): 
 	# added 6.22.2003 - Run As Root functionality
@@ -561,19 +610,23 @@ class keypanel:
 	self.loadUp()
 
     def doSave(self,*args):
+	if self.no_save==1:
+		self.keys_too_big(self.preffile)
+		self.setStatus(_("Error saving."))
+		return 0
 	try:
-		f=open(self.preffile,"w")
-		flist=self.mykeys.keys()
-		flist.sort()
+		# build the whole file first and hand it to a single write()
+		flist=self.keylist
 		wrotex=0
-		f.write(self.start_comment)
+		out=[self.start_comment]
 		for ii in flist:
 			if (ii.startswith("XF86")) and (wrotex==0):
-				f.write(self.x_comment+"\n")
+				out.append(self.x_comment+"\n")
 				wrotex=1
-				f.write("key \""+ii+"\"\t\t"+self.mykeys[ii]+"\n")
-			else:
-				f.write("key \""+ii+"\"\t\t"+self.mykeys[ii]+"\n")
+			out.append("key \""+ii+"\"\t\t"+self.mykeys[ii]+"\n")
+		f=open(self.preffile,"w")
+		f.write("".join(out))
+		f.close()
 		self.setStatus(_("Saved."))
 		return 1
 	except:
@@ -582,25 +635,31 @@ class keypanel:
 		return 0
 
     def restart_ice(self,*args) :
-	if msg_confirm(DIALOG_TITLE,_("WARNING:\nThis feature doesn't work perfectly on all systems.\nBSD and some other systems may experience problems."))	== 1:
-		i=self.doSave()
-		if i==1:
-			#    changed 12.24.2003 - use common Bash shell probing
-			#    to fix BUG NUMBER: 1523884
-			#    Reported By: david ['-at-'] jetnet.co.uk
-			#    Reported At: Fri Oct 31 23:47:12 2003
-			fork_process("killall -HUP -q icewm")
-			fork_process("killall -HUP -q icewm-gnome")
+	global BSD_WARN
+	if not BSD_WARN==1:  # warn once per session, like the Keyboard window does
+		if not msg_confirm(DIALOG_TITLE,_("WARNING:\nThis feature doesn't work perfectly on all systems.\nBSD and some other systems may experience problems."))==1:
+			return
+	BSD_WARN=1
+	if self.no_save==1: i=1  # the keys file wasn't loaded, leave it alone and just restart
+	else: i=self.doSave()
+	if i==1:
+		#    changed 12.24.2003 - use common Bash shell probing
+		#    to fix BUG NUMBER: 1523884
+		#    Reported By: david ['-at-'] jetnet.co.uk
+		#    Reported At: Fri Oct 31 23:47:12 2003
+		fork_process("killall -HUP -q icewm")
+		fork_process("killall -HUP -q icewm-gnome")
 
 
     def setStatus(self,stattext):
 	self.status.set_text(_(str(stattext)))
 
-    def backup(self,file_name): # create backup of prefs file before editing
+    def backup(self,file_name,ff=None): # create backup of prefs file before editing
 	try:
-		f=open(file_name)
-		ff=f.read()
-		f.close()
+		if ff==None:  # contents not already read by the caller
+			f=open(file_name)
+			ff=f.read()
+			f.close()
 		f=open(file_name+".backup-file","w")
 		f.write(ff)
 		f.flush()
@@ -638,15 +697,20 @@ class keypanel:
 
     def is_on_path(self,exec_name):  # new in version 1.2, check to see if an executable is on the path
 	exec_name=self.get_exec_short(exec_name)
+	if exec_name==self.last_found: return 1  # testing the same key again, skip the PATH scan
 
 	try:
 		if exec_name.find(os.sep)>-1:  # check first to see if exec_name is a FULL path
-			if os.path.exists(exec_name): return 1
+			if os.path.exists(exec_name):
+				self.last_found=exec_name
+				return 1
 			else: return -1  # full path given, but not in system	
 		else:
 			paths=os.environ['PATH'].split(":")
 			for ii in paths:
-				if os.path.exists(ii+os.sep+exec_name): return 1
+				if os.path.exists(ii+os.sep+exec_name):
+					self.last_found=exec_name
+					return 1
 			return 0 # no full path given, and not on path
 	except:
 		pass
@@ -720,9 +784,14 @@ class keywintab:
 	mainframe.add(cbox)
 	mainvbox.pack_start(mainframe,1,1,5)
 
-	self.adj1.connect("value_changed",self.doApply)
-	self.adj2.connect("value_changed",self.doApply)
-	self.clickcheck.connect("clicked",self.doApply)
+	# slider and checkbox changes are coalesced into one xset run, the
+	# Apply button still applies at once
+	self.apply_timer=None
+	self.last_applied=None  # the last xset command we ran, to skip repeating it
+	self.handlers=[]  # (widget, handler id), blocked while Reset moves the sliders
+	for ii in [self.adj1,self.adj2]:
+		self.handlers.append((ii,ii.connect("value_changed",self.queueApply)))
+	self.handlers.append((self.clickcheck,self.clickcheck.connect("clicked",self.queueApply)))
 	abutton=getPixmapButton(None, STOCK_YES , _("Apply"))
 	TIPS.set_tip(abutton,_("Apply"))
 	rbutton=getPixmapButton(None, STOCK_UNDO , _("Reset"))
@@ -741,28 +810,51 @@ class keywintab:
 	cbutton.connect("clicked",reapplySettings)
 	mainvbox.show_all()
 
+    def queueApply(self,*args) : # wait for the changes to settle, then apply once
+	if not self.apply_timer==None: timeout_remove(self.apply_timer)
+	self.apply_timer=timeout_add(200,self.flushApply)
+
+    def flushApply(self,*args) :
+	self.apply_timer=None
+	self.applyRate(0)
+	return 0  # run once
+
+    def cancelApply(self) :
+	if not self.apply_timer==None:  # applying now, drop the queued run
+		timeout_remove(self.apply_timer)
+		self.apply_timer=None
+
     def doReset(self,*args) : # reset to a reasonable speed
 	global KB_SETTINGS
-	#    changed 12.24.2003 - use common Bash shell probing
-	#    to fix BUG NUMBER: 1523884
-	#    Reported By: david ['-at-'] jetnet.co.uk
-	#    Reported At: Fri Oct 31 23:47:12 2003
-	fork_process("xset r rate 400 20 &> /dev/null")
 	KB_SETTINGS[0]="xset r rate 400 20"
+	runXset([KB_SETTINGS[0]])
+	self.last_applied=KB_SETTINGS[0]  # the sliders moving back to 400/20 need no second xset
+	for ii,hid in self.handlers: ii.handler_block(hid)
 	self.adj2.set_value(400)
 	self.adj1.set_value(20)
+	self.clickcheck.set_active(1)  # 'xset r rate' turns auto-repeat on, show that
+	for ii,hid in self.handlers: ii.handler_unblock(hid)
 	self.entry.set_text("")
 
     def doApply(self,*args) : # set to desired speed
-	#print "doApply-11"
+	self.applyRate(1)  # the Apply button always runs xset
+
+    def setRate(self) : # store the wanted repeat setting in KB_SETTINGS, without applying it
 	global KB_SETTINGS
+	self.cancelApply()
 	if self.clickcheck.get_active():
-		os.popen("xset r rate "+str(int(self.adj2.value))+" "+str(int(self.adj1.value))).readlines()
 		KB_SETTINGS[0]="xset r rate "+str(int(self.adj2.value))+" "+str(int(self.adj1.value))
 	else:
-		os.popen("xset -r ").readlines()
 		KB_SETTINGS[0]="xset -r"
 	self.entry.set_text("")
+	return KB_SETTINGS[0]
+
+    def applyRate(self,force=0) :
+	#print "doApply-11"
+	rate_cmd=self.setRate()
+	if force==1 or not rate_cmd==self.last_applied:  # nothing to do if the X server already has it
+		runXset([rate_cmd])
+		self.last_applied=rate_cmd
 
 
 ##########################################
@@ -862,11 +954,14 @@ class keysoundtab:
 	mainframe2.add(cbox2)
 	mainvbox.pack_start(mainframe2,1,1,5)
 
+	# like the Repetition tab, changes are coalesced into one xset run
+	self.apply_timer=None
+	self.handlers=[]  # (widget, handler id), blocked while Reset sets the widgets
 	for ii in [self.adj1,self.adj2, self.adj3,self.adj4]:
-		ii.connect("value_changed",self.doApply)
+		self.handlers.append((ii,ii.connect("value_changed",self.queueApply)))
 
-	self.clickcheck.connect("clicked",self.doApply)
-	self.clickcheck1.connect("clicked",self.doApply)
+	for ii in [self.clickcheck,self.clickcheck1]:
+		self.handlers.append((ii,ii.connect("clicked",self.queueApply)))
 	for ii in [chb1,chb2,chb3,chb]:
 		ii.get_children()[0].set_alignment(0.0,1.0)
 	abutton=getPixmapButton(None, STOCK_YES , _("Apply"))
@@ -890,45 +985,64 @@ class keysoundtab:
     def runTest(self,*args) :
 	GDK.beep()  # test the keyboard beep
 
+    def queueApply(self,*args) : # wait for the changes to settle, then apply once
+	if not self.apply_timer==None: timeout_remove(self.apply_timer)
+	self.apply_timer=timeout_add(200,self.flushApply)
+
+    def flushApply(self,*args) :
+	self.apply_timer=None
+	self.doApply()
+	return 0  # run once
+
+    def cancelApply(self) :
+	if not self.apply_timer==None:  # applying now, drop the queued run
+		timeout_remove(self.apply_timer)
+		self.apply_timer=None
+
     def doReset(self,*args) : # reset to a reasonable speed
 	global KB_SETTINGS
-	os.popen("xset c on").readlines()  # click on
-	os.popen("xset c 5").readlines()
-	os.popen("xset b on").readlines()  # bell on
-	os.popen("xset b 50 400 100").readlines()
-	KB_SETTINGS[1]="xset b on"
+	self.cancelApply()
+	KB_SETTINGS[1]="xset b on"  # bell on
 	KB_SETTINGS[2]="xset b 50 400 100"
-	KB_SETTINGS[3]="xset c on"
+	KB_SETTINGS[3]="xset c on"  # click on
 	KB_SETTINGS[4]="xset c 5"
+	self.runSettings()
+	# the widgets only need to show the new values, runSettings() already applied them
+	for ii,hid in self.handlers: ii.handler_block(hid)
 	self.adj4.set_value(100)
 	self.adj3.set_value(400)
 	self.adj2.set_value(50)
 	self.adj1.set_value(5)
 	self.clickcheck.set_active(1)
+	self.clickcheck1.set_active(1)
+	for ii,hid in self.handlers: ii.handler_unblock(hid)
 	self.runTest()
 
     def doApply(self,*args) : # click and beep
+	self.setSound()
+	self.runSettings()
+
+    def setSound(self) : # store the wanted bell and click settings in KB_SETTINGS, without applying them
 	#print "doApply"
 	global KB_SETTINGS
+	self.cancelApply()
 	if self.clickcheck1.get_active():
-		os.popen("xset b on").readlines()  # bell on
-		KB_SETTINGS[1]="xset b on"
-		os.popen("xset b "+str(int(self.adj2.value))+" "+str(int(self.adj3.value))+" "+str(int(self.adj4.value))).readlines()
+		KB_SETTINGS[1]="xset b on"  # bell on
 		KB_SETTINGS[2]="xset b "+str(int(self.adj2.value))+" "+str(int(self.adj3.value))+" "+str(int(self.adj4.value))
 	else:
-		os.popen("xset -b").readlines()  # bell off
-		KB_SETTINGS[1]="xset -b"
+		KB_SETTINGS[1]="xset -b"  # bell off
 		KB_SETTINGS[2]=""
 	if self.clickcheck.get_active():
-		os.popen("xset c on").readlines()  # click on
-		os.popen("xset c "+str(int(self.adj1.value))).readlines()
-		KB_SETTINGS[3]="xset c on"
+		KB_SETTINGS[3]="xset c on"  # click on
 		KB_SETTINGS[4]="xset c "+str(int(self.adj1.value))
 	else:
-		os.popen("xset -c").readlines()  # click off
-		KB_SETTINGS[3]="xset -c"
+		KB_SETTINGS[3]="xset -c"  # click off
 		KB_SETTINGS[4]=""
 
+    def runSettings(self) :
+	global KB_SETTINGS
+	runXset(KB_SETTINGS[1:])  # bell and click in one xset run
+
 
 
 ###################
@@ -937,7 +1051,6 @@ class keysoundtab:
 class keywin:
     def __init__(self) :
 	self.version=this_software_version
-	cwin=Window()
 	cwin=Window(WINDOW_TOPLEVEL)
 	set_basic_window_icon(cwin)
 	cwin.set_wmclass("icewmcp-keyboard","icewmcp-Keyboard")
@@ -1001,6 +1114,7 @@ class keywin:
 	short_tab=keypanel(0)
 	SHORT_TAB=short_tab
 	global ICE_TAB
+	import icepref  # only the full Keyboard window needs IcePref, not IceMe's key editor
 	ICE_TAB=icepref.PullTab("Key Bindings")
 	icetab=ICE_TAB.get_tab()
 	icepan=VBox(0,0)
@@ -1023,7 +1137,7 @@ class keywin:
 
 	notebook.append_page(keywinta.mainvbox, Label(_("Repetition")))
 	notebook.append_page(BELL_TAB.mainvbox, Label(_("Sound")))
-	notebook.append_page(short_tab.createPanel(0), Label(_("Shortcut Keys")))
+	notebook.append_page(short_tab.createPanel(0,0), Label(_("Shortcut Keys")))
 	notebook.append_page(icepan, Label(_("IceWM Keys")))
 
 	short_tab.appbutt.connect("clicked",restart_ice)
@@ -1033,6 +1147,8 @@ class keywin:
 	global C_WINDOW
 	C_WINDOW=cwin
 	cwin.show_all()
+	# the Shortcut Keys tab isn't visible at first, read its file once the window is up
+	idle_add(short_tab.loadUp)
 
     def openKey(self,*args):
 	self.notebook.set_current_page(2)
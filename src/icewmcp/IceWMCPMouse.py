@@ -297,7 +297,6 @@ class cursortab:
 class mousewin:
     def __init__(self) :
 	self.version=this_software_version
-	cwin=Window()
 	cwin=Window(WINDOW_TOPLEVEL)
 	set_basic_window_icon(cwin)
 	cwin.set_wmclass("icewmcp-mouse","icewmcp-Mouse")
@@ -46,7 +46,8 @@
 #############################
 
 
-import os, copy
+import os, shlex, subprocess
+from collections import OrderedDict
 
 #set translation support
 from icewmcp_common import *
@@ -54,6 +55,32 @@ from icewmcp_common import *
 def _(somestr):
 	return to_utf8(translateCP(somestr))
 
+# labels never change while the program runs, so translate them once
+RUN_TITLE=_("Run a program")+"..."
+RUN_COMMAND_LABEL=_("Command to run")+":"
+RUN_BROWSE=_("Browse...")
+RUN_SELECT_PROGRAM=_("Select A Program")
+RUN_RUN=_("Run")
+RUN_RUN_TIP=_("Run the selected command")
+RUN_CLOSE_TIP=_("Close and exit")
+RUN_SELECT=_('Select')
+RUN_CANCEL=_('Cancel')
+RUN_FAILED=_("Could not run")+":"
+
+# how many commands the Run history keeps
+RUN_HISTORY_SIZE=20
+
+# the user's home directory, looked up once per process
+global RUN_HOME_DIR
+RUN_HOME_DIR=None
+
+def getRunHomeDir():
+	global RUN_HOME_DIR
+	if RUN_HOME_DIR==None:
+		RUN_HOME_DIR=os.environ.get("HOME","").strip()   # no $HOME, use the current directory
+		if RUN_HOME_DIR and not RUN_HOME_DIR.endswith("/"): RUN_HOME_DIR=RUN_HOME_DIR+"/"
+	return RUN_HOME_DIR
+
 
 class runwindow:
   def __init__ (self) :
@@ -62,12 +89,14 @@ class runwindow:
     runwindow.set_wmclass("icewmcontrolpanel","IceWMControlPanel")
     self._root = runwindow
     tips=TIPS
-    self.rcommands=[]
+    self.rcommands=OrderedDict()   # used as an ordered set, oldest command first
     self.cmd_file=".icewmcp_gtkruncmd"
+    self._loaded=0
+    self._dirty=0   # set when the history changed since it was last written
+    self._auto_text=None   # the command updateCombo put in the entry, as opposed to one the user typed
     self.last_file="/usr/X11R6/bin/gedit"
-    runwindow.set_title (_("Run a program")+"...")
+    runwindow.set_title (RUN_TITLE)
     runwindow.set_position (GTK.WIN_POS_CENTER)
-    runwindow.set_size_request(470,-1)
     runwindow.set_default_size(470,-1)
     runwindow.realize()
     self.runwindow = runwindow
@@ -77,7 +106,7 @@ class runwindow:
     vbox1.pack_start(getImage(getBaseDir()+"icewmcp.png",DIALOG_TITLE),0,0,2)
     hbox1 = gtk.HBox (1, 0)
     self.hbox1 = hbox1
-    cmdlab = gtk.Label (_("Command to run")+":")
+    cmdlab = gtk.Label (RUN_COMMAND_LABEL)
     cmdlab.set_justify (GTK.JUSTIFY_LEFT)
     cmdlab.set_alignment ( 0.06, 0.5)
     self.cmdlab = cmdlab
@@ -88,13 +117,14 @@ class runwindow:
     vbox1.pack_start ( hbox1, 1, 1, 0)
     hbox2 = gtk.HBox (0, 0)
     self.hbox2 = hbox2
-    runcombo = gtk.Combo ()
+    self._store = gtk.ListStore(str)   # kept for the life of the dialog, refilled in place
+    runcombo = gtk.ComboBoxEntry (self._store, 0)
     self.runcombo = runcombo
-    runentry = runcombo.entry
+    runentry = runcombo.get_child()
     self.runentry = runentry
     hbox2.pack_start ( runcombo, 1, 1, 9)
-    browsebutt = getPixmapButton(None, STOCK_OPEN ,_("Browse..."))
-    tips.set_tip(browsebutt,_("Select A Program"))
+    browsebutt = getPixmapButton(None, STOCK_OPEN ,RUN_BROWSE)
+    tips.set_tip(browsebutt,RUN_SELECT_PROGRAM)
     browsebutt.connect("clicked",self.showFileSel)
     self.browsebutt = browsebutt
     hbox2.pack_start ( browsebutt, 0, 0, 0)
@@ -102,106 +132,134 @@ class runwindow:
     hbox3 = gtk.HBox (1, 0)
     hbox3.set_border_width ( 4)
     self.hbox3 = hbox3
-    runbutt = getPixmapButton(None, STOCK_EXECUTE ,_("Run"))
-    tips.set_tip(runbutt,_("Run the selected command"))
+    runbutt = getPixmapButton(None, STOCK_EXECUTE ,RUN_RUN)
+    tips.set_tip(runbutt,RUN_RUN_TIP)
     self.runbutt = runbutt
     self.runbutt.connect("clicked",self.runCommand)
     hbox3.pack_start ( runbutt, 1, 1, 0)
     spacer2 = gtk.Label ("  ")
     self.spacer2 = spacer2
     hbox3.pack_start ( spacer2, 0, 0, 0)
-    cancelbutt = getPixmapButton(None, STOCK_CANCEL ,_("Close"))
-    tips.set_tip(cancelbutt,_("Close and exit"))
+    cancelbutt = getPixmapButton(None, STOCK_CANCEL ,DIALOG_CLOSE)
+    tips.set_tip(cancelbutt,RUN_CLOSE_TIP)
     cancelbutt.connect("clicked",self.quitit)
     self.cancelbutt = cancelbutt
     hbox3.pack_start ( cancelbutt, 1, 1, 0)
     vbox1.pack_start ( hbox3, 1, 1, 5)
     runwindow.add(vbox1)
     runwindow.connect("destroy",self.quitit)
-    self.loadCommands()
+    self.updateCombo()   # just 'xterm' until the history is read
     runwindow.set_data("ignore_return",1)  # don't close the window on 'Return' key press, just 'Esc'
     runwindow.connect("key-press-event", keyPressClose)
     runwindow.show_all()
+    # read the history file once the window is up, not before it is mapped
+    gtk.idle_add(self.loadCommands)
 
 
   def showFileSel(self,*args):
     # changed 6.20.2003, to use new common file selection functionality (icewmcp_common)
-    SELECT_A_FILE(self.grabFile, _("Select A Program")+"...","icewmcontrolpanel","IceWMControlPanel",None,_('Select'),_('Cancel'))
+    SELECT_A_FILE(self.grabFile, RUN_SELECT_PROGRAM+"...","icewmcontrolpanel","IceWMControlPanel",None,RUN_SELECT,RUN_CANCEL)
 
   def grabFile(self,*args):   
     # changed 6.20.2003, to use new common file selection functionality (icewmcp_common)
     rcmd=GET_SELECTED_FILE()   # from icewmcp_common
     if rcmd:
-      if not str(rcmd).endswith("/"):
-        self.runentry.set_text(str(rcmd))
-        self.last_file=str(rcmd)
+      rcmd=str(rcmd)
+      if not rcmd.endswith("/"):
+        self.runentry.set_text(rcmd)
+        self.last_file=rcmd
 
 
   def runCommand(self,*args):
     r=self.runentry.get_text().strip()
     if r:
+      self.loadCommands()   # make sure the saved history is in before adding to it
       self.addCommand(r)
       self.saveCommands()
       self.updateCombo()
-      # changed 12.19.2003 - use common Bash shell probing
-      # to fix BUG NUMBER: 1523884
-      # Reported By: david ['-at-'] jetnet.co.uk
-      # Reported At: Fri Oct 31 23:47:12 2003
-      fork_process(r.replace(" ","\\ "))
+      # launch the command directly, without an intermediate shell or an
+      # unread pipe; Popen does not wait, so no '&' is needed.  There is
+      # no shell to expand '~' and '$VARS', so do that ourselves
+      devnull=open(os.devnull,"r+")
+      try:
+        try:
+          args=[os.path.expanduser(os.path.expandvars(a)) for a in shlex.split(r)]
+          subprocess.Popen(args, close_fds=True, stdin=devnull, stdout=devnull, stderr=devnull)
+        except (OSError, ValueError, IndexError):   # no such program, bad quoting, empty command
+          msg_err(DIALOG_TITLE, RUN_FAILED+"\n"+r)
+      finally:
+        devnull.close()
 
   def addCommand(self,rcmd):
     if rcmd:
-      try:
-        self.rcommands.remove(rcmd)
-      except:
-        pass
-      self.rcommands.insert(0,rcmd)
+      # re-inserting moves the command to the most-recent end in O(1)
+      self.rcommands.pop(rcmd,None)
+      self.rcommands[rcmd]=None
+      if len(self.rcommands) > RUN_HISTORY_SIZE:
+        self.rcommands.popitem(last=False)   # evict the oldest
+      self._dirty=1
 
   def updateCombo(self):
-    l=copy.copy(self.rcommands)
-    if len(l)==0: l=copy.copy(['xterm'])
-    self.runcombo.set_popdown_strings(l)
+    l=list(reversed(self.rcommands)) or ['xterm']   # most recent first
+    text=self.runentry.get_text()   # detaching the model drops the active row, keep the entry's text
+    # fill the model directly while it is detached, so the view only redraws once
+    self.runcombo.set_model(None)
+    self._store.clear()
+    for i in l:
+      self._store.append((i,))
+    self.runcombo.set_model(self._store)
+    # like the old gtk.Combo, offer the most recent command, unless the user typed something
+    if not text or text==self._auto_text:
+      self.runcombo.set_active(0)
+      self._auto_text=self.runentry.get_text()
+    elif not self.runentry.get_text()==text:
+      self.runentry.set_text(text)
     self.runcombo.show_all()
 
   def saveCommands(self):
       if not self.cmd_file: return
+      if not self._loaded: return   # history never read, nothing to save
+      if not self._dirty: return   # nothing new was run, the file is current
       try:
-        f=open(self.cmd_file,"w")
-        f.write("# IceWMControlPanel gtk.Run file: DO NOT EDIT!\n")
-        l=copy.copy(self.rcommands)
-        if len(l) > 20:  l=l[0:20]
-        l.reverse()
-        for i in l:
-          f.write(str(i)+"\n")
-        f.flush()
-        f.close()
-      except:
+        l=list(self.rcommands)   # oldest first, so loading restores the order
+        # build the whole file first and hand it to a single write(), into a
+        # temporary file renamed over the old one, so a crash never leaves
+        # a truncated history behind (rename() is atomic on POSIX)
+        payload="# IceWMControlPanel gtk.Run file: DO NOT EDIT!\n"+"".join([i+"\n" for i in l])
+        tmp_file=self.cmd_file+".tmp"
+        with open(tmp_file,"w") as f:
+          f.write(payload)
+        os.rename(tmp_file,self.cmd_file)
+        self._dirty=0
+      except (IOError, OSError):
         pass
 
-  def loadCommands(self):
-    try:
-      hdir=str(os.environ["HOME"]).strip()
-      if not hdir.endswith("/"): hdir=hdir+"/"
-      self.cmd_file=hdir+".icewmcp_gtkruncmd"
-    except:
-      self.cmd_file=".icewmcp_gtkruncmd"
+  def loadCommands(self,*args):
+    if self._loaded: return 0
+    self._loaded=1
+    self.cmd_file=getRunHomeDir()+".icewmcp_gtkruncmd"
     try:
       f=open(self.cmd_file)
       scmd=f.read()
       f.close()
-      clist=scmd.split("\n")
-      for i in clist:
-        cstr=i.strip()
-        if cstr:
-          if not cstr.startswith("#"): self.addCommand(cstr)
-      self.updateCombo()
-    except:
-      pass
+    except (IOError, OSError):   # no history yet
+      return 0
+    clist=[i for i in [j.strip() for j in scmd.splitlines()] if i and not i.startswith("#")]
+    # file is oldest first, like rcommands; re-inserting each line, as
+    # addCommand does, lets a repeated command keep its latest position
+    self.rcommands=OrderedDict()
+    for i in clist:
+      self.rcommands.pop(i,None)
+      self.rcommands[i]=None
+    while len(self.rcommands) > RUN_HISTORY_SIZE:
+      self.rcommands.popitem(last=False)
+    self.updateCombo()
+    return 0
 
   def quitit(self,*args):
     self.saveCommands()
+    self._loaded=1   # a pending idle load has no window to fill anymore
     self.runwindow.destroy()
-    self.runwindow.unmap()
 
 
 
@@ -68,8 +68,9 @@
 from string import join
 
 try:
-	import sys
-	sys.path=["/usr/lib/python2.2/site-packages/gtk-2.0"]+sys.path
+	import sys,os
+	if os.path.isdir("/usr/lib/python2.2/site-packages/gtk-2.0") and not "/usr/lib/python2.2/site-packages/gtk-2.0" in sys.path:
+		sys.path.insert(0,"/usr/lib/python2.2/site-packages/gtk-2.0")
 except:
 	pass
 
@@ -88,6 +89,7 @@ ICON_ERROR    = 4
 # will be defined later by icewmcp_common, leave alone
 icon_setter_method=None
 pix_button_setter=None
+shared_tips=None   # one gtk.Tooltips for every message box
 
 class _MessageBox(gtk.Dialog):
     def __init__(self, 
@@ -143,7 +145,9 @@ class _MessageBox(gtk.Dialog):
         label.show()
         if not buttons:
             buttons = ("Ok",)
-        tips=gtk.Tooltips()
+        global shared_tips
+        if shared_tips==None: shared_tips=gtk.Tooltips()
+        tips=shared_tips
         use_stock=0
         if len(stock_icons)>0:
 		if len(buttons)==len(stock_icons):
@@ -2419,7 +2419,7 @@ class Application(Window):
 			      '/usr/lib/X11/icewm/' ]
 	    
 	    # get any additional possibilites from the PATH env variable.
-	    path_dirs = re.split(':', PATH)
+	    path_dirs = PATH.split(':')
 	    for directory in path_dirs:
 		directory = directory + '/lib/X11/icewm/'
 		possibilities.append( directory )
@@ -2507,7 +2507,7 @@ class Application(Window):
 	    for option in whole_options:
 		if option.find("=")==-1: continue
 		if option.strip().startswith("#"): continue
-		option = re.split('=', option)
+		option = option.split('=')
 		option_name = option[0].strip()
 		option_value = option[1]
 		
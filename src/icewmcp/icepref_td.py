@@ -1981,7 +1981,7 @@ class Application(Window):
 
 	    for option in whole_options:
 		if option.find("=")==-1: continue
-		option = re.split('=', option)
+		option = option.split('=')
 		option_name = option[0].strip()
 		option_value = option[1]
 		
@@ -59,9 +59,9 @@ except:
 
 # Some PyGtk2 path settings while we upgrade from PyGtk-1 to PyGtk2
 try:
-	import sys
-	sys.path=["/usr/lib/python2.2/site-packages/gtk-2.0"]+sys.path
-	sys.path=["/usr/lib/python2.3/site-packages/gtk-2.0"]+sys.path
+	import sys,os
+	# one insert, and only for the old paths that exist and are not there yet
+	sys.path[:0]=[ppath for ppath in ["/usr/lib/python2.3/site-packages/gtk-2.0","/usr/lib/python2.2/site-packages/gtk-2.0"] if os.path.isdir(ppath) and not ppath in sys.path]
 	import gtk
 	import gtk.gdk 
 	GDK=gtk.gdk
@@ -94,16 +94,34 @@ INTL_CHARSETS={
 LANGUAGE_CODEC=None  
 # added 12.1.2003, most languages can use built-in 'unicode', will set later
 
+# converted strings, keyed by the original: the same short UI strings
+# (labels, menu items, help tags) go through to_utf8 over and over
+UTF8_CACHE={}
+UTF8_CACHE_SIZE=4096
+
 def to_utf8(somestr):
+	if not type(somestr)==type(""): return convert_to_utf8(somestr)
+	try:
+		return UTF8_CACHE[somestr]
+	except KeyError:
+		pass
+	utfstr=convert_to_utf8(somestr)
+	if len(UTF8_CACHE)>=UTF8_CACHE_SIZE: UTF8_CACHE.clear()
+	UTF8_CACHE[somestr]=utfstr
+	return utfstr
+
+def convert_to_utf8(somestr):
+	if isinstance(somestr,unicode): return somestr.encode("utf-8")
+	if not isinstance(somestr,str): somestr=str(somestr)
 	try:
 		somestr.decode("utf-8")
 		return somestr  # already in utf-8
-	except:
+	except UnicodeDecodeError:
 		pass
 	try:
 		if LANGUAGE_CODEC==None:
-			unistr = unicode(str(somestr),DEFAULT_CHARSET)
-		else: unistr=LANGUAGE_CODEC.decode(str(somestr))[0]
+			unistr = somestr.decode(DEFAULT_CHARSET)
+		else: unistr=LANGUAGE_CODEC.decode(somestr)[0]
 		utfstr = unistr.encode("utf-8")
 		return utfstr
 	except:
@@ -151,7 +169,7 @@ def remove_utf8(some_string):
 
 
 import gtk
-import gettext,sys,os,gtk.gdk,glob,string
+import gettext,sys,os,gtk.gdk,glob,string,re,binascii,subprocess
 
 TIPS=gtk.Tooltips()  # added 4/27/2003
 
@@ -385,11 +403,23 @@ def set_basic_window_icon(mywindow):
 
 FORCE_LOCALE=""    # example:  'ru'
 
+# The directories below cannot change while a program runs, so they are
+# worked out once at import and the get*Dir() functions just return them
+
+def findBaseDir() :
+	base_dir=sys.argv[0][0:sys.argv[0].rfind(os.sep)+1]
+	if base_dir=='': return "."+os.sep
+	return base_dir
+
+ICEWMCP_BASE_DIR=findBaseDir()
+
 def getBaseDir() :
-	if sys.argv[0][0:sys.argv[0].rfind(os.sep)+1]=='': return "."+os.sep
-	return sys.argv[0][0:sys.argv[0].rfind(os.sep)+1]
+	return ICEWMCP_BASE_DIR
 
 locale_dirs=[getBaseDir()+'/locale','/usr/share/locale','/usr/X11R6/share/locale','/usr/locale','/usr/local/share/locale']
+# skip directories that are not there, so every catalog lookup below
+# does not probe them again
+locale_dirs=[LOCALE_DIR for LOCALE_DIR in locale_dirs if os.path.isdir(LOCALE_DIR)]
 
 
 # added 6.8.2003 - a method for forcing the loading
@@ -410,65 +440,75 @@ def getForcedLocale(catalog):  # This fails for chinese zh_tw
 
 
 
+ICEWMCP_PIX_DIR=ICEWMCP_BASE_DIR+os.sep+"pixmaps"+os.sep
+ICEWMCP_DOC_DIR=ICEWMCP_BASE_DIR+os.sep+"doc"+os.sep
+
 def getPixDir() :
-    return getBaseDir()+os.sep+"pixmaps"+os.sep
+    return ICEWMCP_PIX_DIR
 
 def getDocDir() :
-    return getBaseDir()+os.sep+"doc"+os.sep
+    return ICEWMCP_DOC_DIR
+
 
+# added 6.19.2003: Some locales are so radically different even if the language 
+# like 'Chinese' is the same, so exceptions for a few: Chinese, Portuguese where 
+# regional differences = total language difference, we will keep the WHOLE locale name 
+#  i.e.  'zh_tw', instead of cutting it to 'zh'
+LOCALE_EXCEPTIONS=('zh_tw','zh_sg','zh_hk','zh_cn','pt_br','pt_pt')
 
 # added 4.25.2003 - centralized method for finding locale-based sub-directories in IceWMCP directory tree
-def getLocaleDir():
+def findLocaleDir():
 	if not FORCE_LOCALE=='': return FORCE_LOCALE.lower()+"/"  # added 6.8.2003
 
-	# added 6.19.2003: Some locales are so radically different even if the language 
-	# like 'Chinese' is the same, so exceptions for a few: Chinese, Portuguese where 
-	# regional differences = total language difference, we will keep the WHOLE locale name 
-	#  i.e.  'zh_tw', instead of cutting it to 'zh'
-
-	EXCEPTIONS=['zh_tw','zh_sg','zh_hk','zh_cn','pt_br','pt_pt']
-	loc_vars=['LANG', 'LANGUAGE', 'LC_ALL', 'LOCALE', 'LC_MESSAGES']
+	loc_vars=('LANG', 'LANGUAGE', 'LC_ALL', 'LOCALE', 'LC_MESSAGES')
 	# rewritten, 12.19.2003, to probe more than LANG and LANGUAGE, also code cleanup
 	for locvar in loc_vars:
-		try:
-			mylang=os.environ[locvar]  # try $LANG variable first
-			if mylang.strip()=='': continue
-			for ii in EXCEPTIONS:
-				if mylang.strip().lower().startswith(ii): return ii+"/"
-			if mylang.find("_")>-1: mylang=mylang[0:mylang.find("_")]  #  es_MX  -> 'es'
-			mylang=mylang.strip().lower()+os.sep   # example:  "es/"
-			return mylang
-		except:
-			pass
+		mylang=os.environ.get(locvar,"").strip().lower()  # try $LANG variable first
+		if mylang=='': continue
+		for ii in LOCALE_EXCEPTIONS:
+			if mylang.startswith(ii): return ii+"/"
+		i=mylang.find("_")
+		if i>-1: mylang=mylang[0:i]  #  es_MX  -> 'es'
+		return mylang+os.sep   # example:  "es/"
 	return ""  # default to no sub-directory at all
 
+ICEWMCP_LOCALE_DIR=findLocaleDir()
+
+def getLocaleDir():
+	return ICEWMCP_LOCALE_DIR
+
 
 # Set up locale for Pango, 12.1.2003 - Erica Andrews 
 ice_locale_check=getLocaleDir().replace("/","").strip()
-if INTL_CHARSETS.has_key(ice_locale_check):
-	DEFAULT_CHARSET=INTL_CHARSETS[ice_locale_check]
+DEFAULT_CHARSET=INTL_CHARSETS.get(ice_locale_check,DEFAULT_CHARSET)
 
 #Setup Chinese language support
 if ice_locale_check=="zh_tw":
 	try:
-		sys.path=["/usr/lib/python2.2/site-packages/cjkcodecs"]+sys.path
-		sys.path=["/usr/lib/python2.3/site-packages/cjkcodecs"]+sys.path
+		sys.path[:0]=[ppath for ppath in ["/usr/lib/python2.3/site-packages/cjkcodecs","/usr/lib/python2.2/site-packages/cjkcodecs"] if os.path.isdir(ppath) and not ppath in sys.path]
 		from cjkcodecs import big5
 		LANGUAGE_CODEC=big5.codec
 	except:
 		pass
 
+# the charset/codec may have just changed: drop anything converted with the old one
+UTF8_CACHE.clear()
+
 #print DEFAULT_CHARSET
 #print ice_locale_check
 
+ICEWMCP_HELP_DIR=ICEWMCP_BASE_DIR+os.sep+"help"+os.sep
+
 # added 4.25.2003 - centralized method for locating the 'Help' sub-directory
 def getHelpDir():
-    return getBaseDir()+os.sep+"help"+os.sep
+    return ICEWMCP_HELP_DIR
 
 
 # added 4.25.2003 - centralized method for locating locale-specific 'Help' file sub-directory
+ICEWMCP_HELP_DIR_LOCALE=ICEWMCP_HELP_DIR+ICEWMCP_LOCALE_DIR
+
 def getHelpDirLocale():
-    return getHelpDir()+getLocaleDir()
+    return ICEWMCP_HELP_DIR_LOCALE
 
 def loadImage(picon,windowval=None):
     try:
@@ -482,14 +522,40 @@ def loadImage(picon,windowval=None):
     except:
         return None
 
+# decoded images by (path, modification time), so the splash, About and
+# Help windows don't read and decode the same PNG over and over
+PIXBUF_CACHE={}
+PIXBUF_CACHE_SIZE=32
+
+def getCachedPixbuf(picon):
+	key=(picon,os.path.getmtime(picon))
+	pixbuf=PIXBUF_CACHE.get(key)
+	if pixbuf==None:
+		pixbuf=gtk.gdk.pixbuf_new_from_file(picon)
+		if len(PIXBUF_CACHE)>=PIXBUF_CACHE_SIZE: PIXBUF_CACHE.clear()
+		PIXBUF_CACHE[key]=pixbuf
+	return pixbuf
+
+# scaled pixmap/mask pairs by (path, modification time, height, width): the
+# same icon is scaled to the same size for every button that shows it
+SCALED_CACHE={}
+
+def getScaledPixmap(picon,newheight,newwidth):
+	key=(picon,os.path.getmtime(picon),newheight,newwidth)
+	pm=SCALED_CACHE.get(key)
+	if pm==None:
+		img=getCachedPixbuf(picon).scale_simple(newheight,newwidth,gtk.gdk.INTERP_BILINEAR)
+		pm=img.render_pixmap_and_mask()
+		if len(SCALED_CACHE)>=PIXBUF_CACHE_SIZE: SCALED_CACHE.clear()
+		SCALED_CACHE[key]=pm
+	return pm
+
 def loadScaledImage(picon,newheight=40,newwidth=40):  # added in version 0.3, gdkpixbup support, load png, xpm, or gif, allow scaling of images
     try:
 	if (picon.startswith("gtk-")) : # a stock icon
 		# No way to scale stock icons, so just return the default size
 		return loadImage(picon)
-        img = gtk.gdk.pixbuf_new_from_file(picon)
-        img2 = img.scale_simple(newheight,newwidth,gtk.gdk.INTERP_BILINEAR)
-        pix,mask = img2.render_pixmap_and_mask()
+        pix,mask = getScaledPixmap(picon,newheight,newwidth)
         icon = gtk.Image()
         icon.set_from_pixmap(pix, mask)
         icon.show()
@@ -533,143 +599,74 @@ def getIconButton (iwin,picon,lab="?") :
 
 global MY_ICEWM_PATH
 MY_ICEWM_PATH=None
+global MY_ICEWM_PRIV_PATH
+MY_ICEWM_PRIV_PATH=None
 
 def getIceWMPrivConfigPath():  # implemented in 0.3 - check environ variable, though who really uses this variable?
-	if os.environ.has_key("ICEWM_PRVCFG"): 	ppath=os.environ['ICEWM_PRVCFG']
-	else: 	ppath=os.environ['HOME']+os.sep+".icewm"+os.sep
+	global MY_ICEWM_PRIV_PATH
+	if not MY_ICEWM_PRIV_PATH==None: return MY_ICEWM_PRIV_PATH
+	# expanduser() falls back to the password database when $HOME is unset
+	ppath=os.environ.get("ICEWM_PRVCFG") or os.path.join(os.path.expanduser("~"),".icewm")+os.sep
 	if not ppath.endswith(os.sep): ppath=ppath+os.sep
+	MY_ICEWM_PRIV_PATH=ppath
 	return ppath
 
+ICEWM_CONFIG_PATHS=("/usr/X11R6/lib/X11/icewm/","/usr/local/lib/X11/icewm/","/etc/X11/icewm/","/etc/icewm/","/usr/local/share/icewm/","/usr/local/lib/icewm/","/usr/share/icewm/","/usr/X11R6/share/icewm/","/usr/lib/icewm/")
+
 def getIceWMConfigPath():  # new in version 0.3, search for IceWM global config path in likely locations
 	global MY_ICEWM_PATH
 	if not MY_ICEWM_PATH==None: return MY_ICEWM_PATH
-	for iipath in ["/usr/X11R6/lib/X11/icewm/","/usr/local/lib/X11/icewm/","/etc/X11/icewm/","/etc/icewm/","/usr/local/share/icewm/","/usr/local/lib/icewm/","/usr/share/icewm/","/usr/X11R6/share/icewm/","/usr/lib/icewm/"]:
-		try:
-			if os.path.exists(iipath) and os.path.isdir(iipath): 
-				MY_ICEWM_PATH=iipath
-				return iipath
-		except:
-			pass
-	MY_ICEWM_PATH="/usr/X11R6/lib/X11/icewm/"  # we didnt find the path, use a default
-	return "/usr/X11R6/lib/X11/icewm/"
+	for iipath in ICEWM_CONFIG_PATHS:
+		if os.path.isdir(iipath):   # False for missing paths too, no need for exists()
+			MY_ICEWM_PATH=iipath
+			return iipath
+	MY_ICEWM_PATH=ICEWM_CONFIG_PATHS[0]  # we didnt find the path, use a default
+	return MY_ICEWM_PATH
 
 
 
 ## added 2.18.2003 - some suggested consolidation, also  preliminary localization support
 
-# gettext locale support - icewmcp
-icewmcp_xtext=gettext.NullTranslations()
-
-try:
-	# open icewmcp.mo in /usr/share/locale or whatever
-	f_gettext=0
-	icewmcp_xtext=getForcedLocale("icewmcp")
-	if not icewmcp_xtext==None: f_gettext=1
-	else:
-	   for LOCALE_DIR in locale_dirs:  # open the first catalog we find, try ./locale dir first
-		try:
-			icewmcp_xtext=gettext.translation("icewmcp",LOCALE_DIR)
-			f_gettext=1
-			break
-		except:
-			pass
-	if not f_gettext==1: raise TypeError   # couldnt find a gettext catalog, raise exception, use empty catalog
-except:
-	icewmcp_xtext=gettext.NullTranslations()
-
-translateCP=icewmcp_xtext.gettext
-
-
-# gettext locale support - icepref2
-icewmcp_icepref_xtext=gettext.NullTranslations()
-
-try:
-	# open icewmcp-icepref.mo in /usr/share/locale or whatever
-	f_gettext=0
-	icewmcp_icepref_xtext=getForcedLocale("icewmcp-icepref")
-	if not icewmcp_icepref_xtext==None: f_gettext=1
-	else:
-	   for LOCALE_DIR in locale_dirs:  # open the first catalog we find, try ./locale dir first
-		try:
-			icewmcp_icepref_xtext=gettext.translation("icewmcp-icepref",LOCALE_DIR)
-			f_gettext=1
-			break
-		except:
-			pass
-	if not f_gettext==1: raise TypeError   # couldnt find a gettext catalog, raise exception, use empty catalog
-except:
-	icewmcp_icepref_xtext=gettext.NullTranslations()
-
-translateP=icewmcp_icepref_xtext.gettext
-
-
-# gettext locale support - Ice Sound Manager
-icewmcp_ism_xtext=gettext.NullTranslations()
-
-try:
-	# open icewmcp-ism.mo in /usr/share/locale or whatever
-	f_gettext=0
-	icewmcp_ism_xtext=getForcedLocale("icewmcp-ism")
-	if not icewmcp_ism_xtext==None: f_gettext=1
-	else:
-	   for LOCALE_DIR in locale_dirs:  # open the first catalog we find, try ./locale dir first
+# wrap a catalog's gettext so each message is looked up only once per process:
+# the same labels are translated again every time a window is built
+def getCachedTranslator(xtext):
+	translated={}
+	def translate(somestr):
 		try:
-			icewmcp_ism_xtext=gettext.translation("icewmcp-ism",LOCALE_DIR)
-			f_gettext=1
-			break
-		except:
-			pass
-	if not f_gettext==1: raise TypeError   # couldnt find a gettext catalog, raise exception, use empty catalog
-except:
-	icewmcp_ism_xtext=gettext.NullTranslations()
-
-translateISM=icewmcp_ism_xtext.gettext
-
-
-# gettext locale support - IceMe
-icewmcp_iceme_xtext=gettext.NullTranslations()
-
-try:
-	# open icewmcp-iceme.mo in /usr/share/locale or whatever
-	f_gettext=0
-	icewmcp_iceme_xtext=getForcedLocale("icewmcp-iceme")
-	if not icewmcp_iceme_xtext==None: f_gettext=1
-	else:
-	   for LOCALE_DIR in locale_dirs:  # open the first catalog we find, try ./locale dir first
+			return translated[somestr]
+		except KeyError:
+			tstr=xtext.gettext(somestr)
+			translated[somestr]=tstr
+			return tstr
+	return translate
+
+
+# gettext locale support: open the first catalog we find for each part of
+# IceWMCP (try ./locale dir first), or use an empty catalog if there is none
+def loadCatalog(catalog):
+	xtext=getForcedLocale(catalog)
+	if not xtext==None: return xtext
+	for LOCALE_DIR in locale_dirs:
 		try:
-			icewmcp_iceme_xtext=gettext.translation("icewmcp-iceme",LOCALE_DIR)
-			f_gettext=1
-			break
+			return gettext.translation(catalog,LOCALE_DIR)
 		except:
 			pass
-	if not f_gettext==1: raise TypeError   # couldnt find a gettext catalog, raise exception, use empty catalog
-except:
-	icewmcp_iceme_xtext=gettext.NullTranslations()
+	return gettext.NullTranslations()
 
-translateME=icewmcp_iceme_xtext.gettext
+icewmcp_xtext=loadCatalog("icewmcp")
+translateCP=getCachedTranslator(icewmcp_xtext)
 
+icewmcp_icepref_xtext=loadCatalog("icewmcp-icepref")    # IcePref2
+translateP=getCachedTranslator(icewmcp_icepref_xtext)
 
-# gettext locale support - HW plugin
-icewmcp_hw_xtext=gettext.NullTranslations()
+icewmcp_ism_xtext=loadCatalog("icewmcp-ism")    # Ice Sound Manager
+translateISM=getCachedTranslator(icewmcp_ism_xtext)
 
-try:
-	# open icewmcp-hw.mo in /usr/share/locale or whatever
-	f_gettext=0
-	icewmcp_hw_xtext=getForcedLocale("icewmcp-hw")
-	if not icewmcp_hw_xtext==None: f_gettext=1
-	else:
-	   for LOCALE_DIR in locale_dirs:  # open the first catalog we find, try ./locale dir first
-		try:
-			icewmcp_hw_xtext=gettext.translation("icewmcp-hw",LOCALE_DIR)
-			f_gettext=1
-			break
-		except:
-			pass
-	if not f_gettext==1: raise TypeError   # couldnt find a gettext catalog, raise exception
-except:
-	icewmcp_hw_xtext=gettext.NullTranslations()
+icewmcp_iceme_xtext=loadCatalog("icewmcp-iceme")    # IceMe
+translateME=getCachedTranslator(icewmcp_iceme_xtext)
 
-translateHW=icewmcp_hw_xtext.gettext
+icewmcp_hw_xtext=loadCatalog("icewmcp-hw")    # HW plugin
+translateHW=getCachedTranslator(icewmcp_hw_xtext)
 
 
 
@@ -689,9 +686,11 @@ EXIT_MENU=_('/File/_Exit')
 UPDATE_MENU=_("Check for newer versions of this program...")
 CONTRIBUTORS=_("Credits")
 # added 4/25/2003 - for Help files
-APP_HELP_STRR=_("/_Help").replace("/_","").replace("/","").replace("(_H)","").replace("_","")   
-# added 4/25/2003 - for Help files
-APP_HELP_STR=_("/_Help").replace("/_","").replace("/","").replace("(_H)","")+"..." 
+# strip the menu path and mnemonic markers from '/_Help' in a single pass
+HELP_LABEL_RE=re.compile(r"/_|/|\(_H\)")
+APP_HELP_STR=HELP_LABEL_RE.sub("",_("/_Help"))
+APP_HELP_STRR=APP_HELP_STR.replace("_","")   
+APP_HELP_STR=APP_HELP_STR+"..." 
 BUG_REPORT_MENU=_("Send A Bug Report")
 RUN_AS_ROOT=_("Run As Root")  # added 6.18.2003
 
@@ -700,8 +699,12 @@ def getImage(im_file,lab_err=DIALOG_TITLE) : # GdkImlib Image loading
 	if (im_file.startswith("gtk-")) : # a stock icon
 		# No way to scale stock icons, so just return the default size
 		return loadImage(im_file)
+        im_file=str(im_file).strip()
         myim= Image()
-        myim.set_from_file(str(im_file).strip())
+        try:
+            myim.set_from_pixbuf(getCachedPixbuf(im_file))
+        except:
+            myim.set_from_file(im_file)  # shows the 'broken image' icon, as before
         return myim
     except:
         return gtk.Label(str(lab_err))
@@ -709,20 +712,26 @@ def getImage(im_file,lab_err=DIALOG_TITLE) : # GdkImlib Image loading
 
 
 # added 4.2.2003 - common message dialogs with attractive icons, version 1.2
-import IceWMCP_Dialogs
-IceWMCP_Dialogs.icon_setter_method=set_special_window_icon
-IceWMCP_Dialogs.pix_button_setter=getPixmapButton
+# IceWMCP_Dialogs is only imported the first time a message box is shown
+def getDialogs():
+	import IceWMCP_Dialogs
+	if IceWMCP_Dialogs.icon_setter_method==None:
+		IceWMCP_Dialogs.icon_setter_method=set_special_window_icon
+		IceWMCP_Dialogs.pix_button_setter=getPixmapButton
+		IceWMCP_Dialogs.shared_tips=TIPS
+	return IceWMCP_Dialogs
+
 def msg_info(wintitle,message):
-	IceWMCP_Dialogs.message(wintitle,message.split("\n"),(DIALOG_OK,),2,1, [STOCK_OK])
+	getDialogs().message(wintitle,message.split("\n"),(DIALOG_OK,),2,1, [STOCK_OK])
 
 def msg_warn(wintitle,message):
-	IceWMCP_Dialogs.message(wintitle,message.split("\n"),(DIALOG_OK,),1,1, [STOCK_OK])
+	getDialogs().message(wintitle,message.split("\n"),(DIALOG_OK,),1,1, [STOCK_OK])
 
 def msg_err(wintitle,message):
-	IceWMCP_Dialogs.message(wintitle,message.split("\n"),(DIALOG_OK,),4,1, [STOCK_OK])
+	getDialogs().message(wintitle,message.split("\n"),(DIALOG_OK,),4,1, [STOCK_OK])
 
 def msg_confirm(wintitle,message,d_ok=DIALOG_OK,d_cancel=DIALOG_CANCEL):
-	ret=IceWMCP_Dialogs.message(wintitle,message.split("\n"),(d_ok,d_cancel,),3,1, 
+	ret=getDialogs().message(wintitle,message.split("\n"),(d_ok,d_cancel,),3,1, 
 		[STOCK_YES, STOCK_NO])
 	if str(ret)==d_ok: return 1
 	else: return 0
@@ -731,9 +740,7 @@ def msg_confirm(wintitle,message,d_ok=DIALOG_OK,d_cancel=DIALOG_CANCEL):
 # new in version 0.3 - let user quickly check for software updates
 def closeUpdateWin(*args):
     try:
-        args[0].get_data("window").hide()
         args[0].get_data("window").destroy()
-        args[0].get_data("window").unmap()
     except:
         pass
 
@@ -748,14 +755,23 @@ SOFTWARE_UPDATE_URL= "http://icesoundmanager.sourceforge.net/ICEWMCP_WEB_VERSION
 
 
 
+# drop line breaks and tabs in one pass, instead of a chain of replace() calls
+STRIP_WS_CHARS="\r\n\t"
+STRIP_WS_MAP=dict.fromkeys(map(ord,STRIP_WS_CHARS))
+
+def stripWhitespace(somestr):
+    if isinstance(somestr,unicode): return somestr.translate(STRIP_WS_MAP).strip()
+    return somestr.translate(None,STRIP_WS_CHARS).strip()
+
 def checkSoftUpdate(*args):
     try:
         import ICEWMCP_URLRead
         up_content=ICEWMCP_URLRead.openUrl(SOFTWARE_UPDATE_URL)
         if up_content.find(",")==-1: raise TypeError  # such as "404 Not Found"
-        if len(up_content.split(","))<2: raise TypeError
-        new_version=up_content.split(",")[0].replace("\n","").replace("\r","").replace("\t","").strip()
-        dl_url=up_content.split(",")[1].replace("\n","").replace("\r","").replace("\t","").strip()
+        up_fields=up_content.split(",")
+        if len(up_fields)<2: raise TypeError
+        new_version=stripWhitespace(up_fields[0])
+        dl_url=stripWhitespace(up_fields[1])
 
         w=gtk.Window(gtk.WINDOW_TOPLEVEL)
         w.set_wmclass("icewmcontrolpanel","IceWMControlPanel")
@@ -810,6 +826,10 @@ app_map={
 7777:["template.py","Help Template Test"],  # for testing purposes only
 }
 
+# each entry also gets the name of its help file: [script, name, help file]
+for app_entry in app_map.values():
+	app_entry.append(app_entry[0].replace(".py","")+".txt")
+
 
 
 # added 4/26/2003...allow some windows to be closed easily by pressing 'Esc' and/or 'Return' on the keyboard
@@ -817,54 +837,53 @@ app_map={
 
 def keyPressClose(widget, event,*args):
     if event.keyval == gtk.keysyms.Escape:
-        widget.hide()
         widget.destroy()
-        widget.unmap()
     elif event.keyval == gtk.keysyms.Return:
         if widget.get_data("ignore_return")==None: # some windows shouldn't close on 'Return'
-            widget.hide()
             widget.destroy()
-            widget.unmap()
 
 
 # added 4.4.2003 - support for sending e-mail bug reports directly from within the program
 # using new ICEWMCP_BugReport module, new in version 1.2
+# the module (and smtplib) is only imported when a report is actually filed
 
-from ICEWMCP_BugReport import *
+def file_bug_report(app_num=5000,*args):
+	import ICEWMCP_BugReport
+	return ICEWMCP_BugReport.file_bug_report(app_num,*args)
 
 
 
 def calculateSegment(rgb_seg):
     if not rgb_seg: return 0
     if not len(rgb_seg)==2: return 0
-    alpha_num_map={"0":0,"1":1,"2":2,"3":3,"4":4,"5":5,"6":6,"7":7,"8":8,"9":9,"a":10,"b":11,"c":12,"d":13,"e":14,"f":15}
+    if not rgb_seg.isalnum(): return 0  # int() would accept a sign or spaces
     try:
-        return (alpha_num_map[str(rgb_seg[0:1])]*16)+alpha_num_map[str(rgb_seg[1:2])]
-    except:
+        return int(rgb_seg,16)
+    except ValueError:
         return 0
 
 def getRGBForHex(hexstr):
      if not hexstr: return (0,0,0)
-     h=hexstr.replace("#","").strip().lower()
+     h=hexstr.replace("#","").strip()
      if not len(h)==6: return None #invalid hex string send
-     r_seg=h[0:2]
-     g_seg=h[2:4]
-     b_seg=h[4:6]
-     R=calculateSegment(r_seg)
-     G=calculateSegment(g_seg)
-     B=calculateSegment(b_seg)
-     return (R,G,B)
+     try:
+         R,G,B=bytearray(binascii.unhexlify(h))  # all three segments in one C call
+         return (R,G,B)
+     except (TypeError, ValueError):  # not all hex digits, keep what can be read
+         return (calculateSegment(h[0:2]),calculateSegment(h[2:4]),calculateSegment(h[4:6]))
 
 
 # Colors and fonts needed for nicely displaying help text files, 4.25.2003
 # Changed 12.6.2003, GDK provides us a colormap, no need for hidden window anymore
-SOME_BLANK_COLORMAP=GDK.rgb_get_colormap()
-COL_BLUE=SOME_BLANK_COLORMAP.alloc_color('SkyBlue3')
-COL_PURPLE=SOME_BLANK_COLORMAP.alloc_color('DarkOrchid4')
-COL_GRAY=SOME_BLANK_COLORMAP.alloc_color('RoyalBlue3')
-COL_BLACK=SOME_BLANK_COLORMAP.alloc_color('black')
-COL_RED=SOME_BLANK_COLORMAP.alloc_color('IndianRed3')
-COL_WHITE=SOME_BLANK_COLORMAP.alloc_color('white')
+# The colors are only parsed here: text tags and widget styles allocate them
+# in the right colormap when they are first drawn, so importing this module
+# does not need to talk to the X server for them
+COL_BLUE=GDK.color_parse('SkyBlue3')
+COL_PURPLE=GDK.color_parse('DarkOrchid4')
+COL_GRAY=GDK.color_parse('RoyalBlue3')
+COL_BLACK=GDK.color_parse('black')
+COL_RED=GDK.color_parse('IndianRed3')
+COL_WHITE=GDK.color_parse('white')
 
 
 # added 6.21.2003 - special fonts for help files in special locales
@@ -896,17 +915,12 @@ HELP_FONTS={
 # load special fonts if the locale requires it
 MY_LANG_LOCALE=getLocaleDir().replace(os.sep,"").lower()
 
-if HELP_FONTS.has_key(MY_LANG_LOCALE):
-	my_locale_lang_fonts=HELP_FONTS[MY_LANG_LOCALE]
-else : my_locale_lang_fonts=HELP_FONTS["all"]
+my_locale_lang_fonts=HELP_FONTS.get(MY_LANG_LOCALE,HELP_FONTS["all"])
 
 HELP_FONT1=my_locale_lang_fonts[0]
 HELP_FONT2=my_locale_lang_fonts[1]
 HELP_FONT3=my_locale_lang_fonts[2]
 LANGCODE=my_locale_lang_fonts[3]
-global RENDER_TAG
-RENDER_TAG=0
-
 
 
 
@@ -914,14 +928,16 @@ RENDER_TAG=0
 
 
 
+# Text tags are shared by name within a buffer: a tag is only created the
+# first time a font/color/language combination is used in that buffer,
+# instead of once for every piece of text inserted
 def get_renderable_tab(mybuffer, myfont,mycolor,mylangcode):
-	global RENDER_TAG
-	RENDER_TAG=RENDER_TAG+1
-	tagname="render-tag"+str(RENDER_TAG)
-	texttag=mybuffer.create_tag(tagname)
-	texttag.set_property("font",myfont)
-	texttag.set_property("foreground-gdk",mycolor)
-	texttag.set_property("language",mylangcode)
+	tagname="render-tag:%s:%d.%d.%d:%s" % (myfont,mycolor.red,mycolor.green,mycolor.blue,mylangcode)
+	if mybuffer.get_tag_table().lookup(tagname)==None:
+		texttag=mybuffer.create_tag(tagname)
+		texttag.set_property("font",myfont)
+		texttag.set_property("foreground-gdk",mycolor)
+		texttag.set_property("language",mylangcode)
 	return tagname
 
 def text_buffer_insert(textbuf, mytag,mytext):
@@ -929,35 +945,51 @@ def text_buffer_insert(textbuf, mytag,mytext):
 	textbuf.insert_with_tags_by_name(textbuf.get_end_iter(), to_utf8(mytext), *tags)
 
 
+# help markup: [PHTITLE], [PHSECTION] and [PHERROR] start a line and pick
+# its handler, [PH-HI]...[/PH-HI] spans can appear anywhere in normal text.
+# Lines come in already stripped, so the handlers just slice the tag off.
+HELP_HI_RE=re.compile(r"(\[/?PH-HI\])")
+
+def renderHelpTitle(textbuf,mline):
+	title_tag=get_renderable_tab(textbuf,HELP_FONT3,COL_BLUE,LANGCODE)
+	text_buffer_insert(textbuf, title_tag,APP_HELP_STRR)
+	text_buffer_insert(textbuf, title_tag,":  "+mline[9:].lstrip()+"\n\n")
+
+def renderHelpSection(textbuf,mline):
+	text_buffer_insert(textbuf, get_renderable_tab(textbuf,HELP_FONT1,COL_PURPLE,LANGCODE),"\n"+mline[11:].lstrip()+":\n")
+
+def renderHelpError(textbuf,mline):
+	text_buffer_insert(textbuf, get_renderable_tab(textbuf,HELP_FONT1,COL_RED,LANGCODE),mline[9:].lstrip()+"\n")
+
+HELP_LINE_HANDLERS={"[PHTITLE]":renderHelpTitle, "[PHSECTION]":renderHelpSection, "[PHERROR]":renderHelpError}
+
 def renderHelp(texta,mesg):
 	textbuf=texta.get_buffer()
+	normal_tag=get_renderable_tab(textbuf,HELP_FONT2,COL_BLACK,LANGCODE)
 	for ii in mesg:
 		mline=ii.strip()
-		if mline.find("[PHTITLE]")>-1:
-			text_buffer_insert(textbuf, get_renderable_tab(textbuf,HELP_FONT3,COL_BLUE,LANGCODE),APP_HELP_STRR)
-			text_buffer_insert(textbuf, get_renderable_tab(textbuf,HELP_FONT3,COL_BLUE,LANGCODE),":  "+mline.replace("[PHTITLE]","").strip()+"\n\n")
-			continue
-		elif mline.find("[PHSECTION]")>-1:
-			text_buffer_insert(textbuf, get_renderable_tab(textbuf,HELP_FONT1,COL_PURPLE,LANGCODE),"\n"+mline.replace("[PHSECTION]","").strip()+":\n")
-			continue
-		elif mline.find("[PHERROR]")>-1:
-			text_buffer_insert(textbuf, get_renderable_tab(textbuf,HELP_FONT1,COL_RED,LANGCODE),mline.replace("[PHERROR]","").strip()+"\n")
+		if mline.startswith("[PH"):
+			handler=HELP_LINE_HANDLERS.get(mline[:mline.find("]")+1])
+			if handler:
+				handler(textbuf,mline)
+				continue
+		if mline.find("[PH-HI]")==-1:
+			text_buffer_insert(textbuf, normal_tag,mline+"\n")
 			continue
-		elif mline.find("[PH-HI]")>-1:
-			mlist=mline.split("[PH-HI]")
-			for yy in mlist:
-				if yy.find("[/PH-HI]")>-1: 
-					text_buffer_insert(textbuf, get_renderable_tab(textbuf,HELP_FONT2,COL_GRAY,LANGCODE),yy[0:yy.find("[/PH-HI]")])
-					text_buffer_insert(textbuf, get_renderable_tab(textbuf,HELP_FONT2,COL_BLACK,LANGCODE),yy[yy.find("[/PH-HI]")+8:len(yy)])			
-				else:  
-					text_buffer_insert(textbuf, get_renderable_tab(textbuf,HELP_FONT2,COL_BLACK,LANGCODE),yy)
-			text_buffer_insert(textbuf, get_renderable_tab(textbuf,HELP_FONT2,COL_BLACK,LANGCODE),"\n")
-		else:
-			text_buffer_insert(textbuf, get_renderable_tab(textbuf,HELP_FONT2,COL_BLACK,LANGCODE),mline.strip()+"\n")
+		# [PH-HI]highlighted[/PH-HI] spans inside normal text
+		hi_tag=get_renderable_tab(textbuf,HELP_FONT2,COL_GRAY,LANGCODE)
+		mytag=normal_tag
+		for yy in HELP_HI_RE.split(mline):
+			if yy=="[PH-HI]": mytag=hi_tag
+			elif yy=="[/PH-HI]": mytag=normal_tag
+			elif yy: text_buffer_insert(textbuf, mytag,yy)
+		text_buffer_insert(textbuf, normal_tag,"\n")
 
 
 
 # added 4.1.2003 - common 'about' dialogs with uniform look, version 1.2
+ABOUT_BREAK_RE=re.compile(r"\n\n|\n")
+
 # 4/26/2003 - also used for displaying Help topics (displayHelp)
 def commonAbout(wintitle, mesg, with_copy=1, logo="icewmcp_short.png",
                 new_line=" ", editable=0, is_help=0) :
@@ -967,7 +999,7 @@ def commonAbout(wintitle, mesg, with_copy=1, logo="icewmcp_short.png",
 		if str(logo).find("icepref2.png")==-1: 
 			logo="icewmcp_short.png"
         editable=0
-        mesg=mesg.replace("\r\n","\n").replace("\r","")
+        mesg=mesg.replace("\r","")   # also turns '\r\n' into '\n'
         if mesg.find("[PHERROR]")==-1: 
             mesg=mesg.replace("IceWM Control Panel","IceWMCP"). \
                       replace("IceWMCP","IceWM Control Panel (IceWMCP)")
@@ -982,9 +1014,8 @@ def commonAbout(wintitle, mesg, with_copy=1, logo="icewmcp_short.png",
         abouttext=""
 
     if not is_help==1:
-        abouttext=abouttext+mesg.replace("\n\n","[ICEWMCP-BREAK]").\
-                                 replace("\n",new_line).\
-                                 replace("[ICEWMCP-BREAK]","\n\n")+"\n"
+        # keep paragraph breaks, join the other lines with 'new_line'
+        abouttext=abouttext+ABOUT_BREAK_RE.sub(lambda m: (m.group(0)=="\n\n" and "\n\n") or new_line,mesg)+"\n"
 
     aboutwin=gtk.Window(gtk.WINDOW_TOPLEVEL)
     set_basic_window_icon(aboutwin)
@@ -1055,12 +1086,12 @@ def commonAbout(wintitle, mesg, with_copy=1, logo="icewmcp_short.png",
 
 
 def displayHelp(appnum=7777,*args):
-	try:
-		htop=app_map[appnum][1]
-		fname=app_map[appnum][0].replace(".py","")+".txt"
-	except:
+	app_entry=app_map.get(appnum)
+	if app_entry==None:
 		htop="Not Found"
 		fname=None
+	else:
+		htop,fname=app_entry[1],app_entry[2]
 	wtitle=APP_HELP_STRR+":  "+htop
 	mesg=""
 	if fname==None:
@@ -1118,9 +1149,7 @@ def hideSplash(*args):
     # close the small Splash screen after loading is complete
     global SPLASH_WIN
     try:
-        SPLASH_WIN.hide()
         SPLASH_WIN.destroy()
-        SPLASH_WIN.unmap()
     except:
         pass
     return 0
@@ -1160,17 +1189,28 @@ NOSPLASH=0
 
 
 # added 6.18.2003 - common file selection functionality
+# The selector is built once and hidden, not destroyed, when it closes, so
+# every later SELECT_A_FILE() just shows it again.  It is only rebuilt if
+# a caller wants a different window class or different button labels.
 ICEWMCP_FILE_WIN=None
+ICEWMCP_FILE_WIN_KEY=None   # (wm_class, wm_name, ok title, cancel title) it was built for
+ICEWMCP_FILE_WIN_OK=None    # handler id of the current caller's 'OK' callback
 ICEWMCP_LAST_FILE=getIceWMPrivConfigPath()
 FILE_SELECTOR_TITLE=_("Select a file...")
 
 def CLOSE_FILE_SELECTOR(*args):
 	   try:
 		ICEWMCP_FILE_WIN.hide()
-		ICEWMCP_FILE_WIN.destroy()
-		ICEWMCP_FILE_WIN.unmap()
 	   except:
 		pass
+	   return 1   # for 'delete-event': keep the window for next time
+
+def FILE_SELECTOR_DESTROYED(widget,*args):
+		global ICEWMCP_FILE_WIN
+		if ICEWMCP_FILE_WIN==widget: ICEWMCP_FILE_WIN=None
+
+def FILE_SELECTOR_KEY_PRESS(widget, event,*args):
+		if event.keyval == gtk.keysyms.Escape: CLOSE_FILE_SELECTOR()
 
 def GET_SELECTED_FILE(*args):
 		gfile=ICEWMCP_FILE_WIN.get_filename()
@@ -1183,32 +1223,53 @@ def SET_SELECTED_FILE(file_name):
 		global ICEWMCP_LAST_FILE
 		ICEWMCP_LAST_FILE=str(file_name)
 
-def SELECT_A_FILE(file_sel_cb,title=FILE_SELECTOR_TITLE,wm_class="icewmcontrolpanel",wm_name="IceWMControlPanel",widget=None,ok_button_title=None,cancel_button_title=None):
-		global ICEWMCP_FILE_WIN
-		ICEWMCP_FILE_WIN = FileSelection(title)
-		set_basic_window_icon(ICEWMCP_FILE_WIN)
-		ICEWMCP_FILE_WIN.set_wmclass(wm_class,wm_name)
-		ICEWMCP_FILE_WIN.ok_button.connect('clicked', file_sel_cb)
-		value = ICEWMCP_LAST_FILE
-		if not widget==None: 
-			ICEWMCP_FILE_WIN.ok_button.set_data("cfg_path",widget.get_data("cfg_path"))
-			if value=='': value=widget.get_data("cfg_path").get_text()
+def buildFileSelector(title,wm_class,wm_name,ok_button_title,cancel_button_title):
+		filewin = FileSelection(title)
+		set_basic_window_icon(filewin)
+		filewin.set_wmclass(wm_class,wm_name)
 		if not ok_button_title==None:
-			ICEWMCP_FILE_WIN.ok_button.remove(
-				ICEWMCP_FILE_WIN.ok_button.get_children()[0])
-			ICEWMCP_FILE_WIN.ok_button.add(
+			filewin.ok_button.remove(
+				filewin.ok_button.get_children()[0])
+			filewin.ok_button.add(
 				getPixmapButton(None, STOCK_APPLY ,str(ok_button_title))
 																)
-			TIPS.set_tip(ICEWMCP_FILE_WIN.ok_button, str(ok_button_title))
+			TIPS.set_tip(filewin.ok_button, str(ok_button_title))
 		if not cancel_button_title==None:
-			ICEWMCP_FILE_WIN.cancel_button.remove( 
-				ICEWMCP_FILE_WIN.cancel_button.get_children()[0])
-			ICEWMCP_FILE_WIN.cancel_button.add(
+			filewin.cancel_button.remove( 
+				filewin.cancel_button.get_children()[0])
+			filewin.cancel_button.add(
 				getPixmapButton(None, STOCK_CANCEL ,str(cancel_button_title))
 																	)
-			TIPS.set_tip(ICEWMCP_FILE_WIN.cancel_button,str(cancel_button_title) )
-		ICEWMCP_FILE_WIN.cancel_button.connect('clicked', CLOSE_FILE_SELECTOR)
-		ICEWMCP_FILE_WIN.connect("destroy",CLOSE_FILE_SELECTOR)
+			TIPS.set_tip(filewin.cancel_button,str(cancel_button_title) )
+		filewin.cancel_button.connect('clicked', CLOSE_FILE_SELECTOR)
+		filewin.connect("delete-event",CLOSE_FILE_SELECTOR)
+		filewin.connect("destroy",FILE_SELECTOR_DESTROYED)
+		filewin.set_data("ignore_return",1)
+		filewin.connect("key-press-event", FILE_SELECTOR_KEY_PRESS)
+		filewin.set_modal(1)
+		return filewin
+
+def SELECT_A_FILE(file_sel_cb,title=FILE_SELECTOR_TITLE,wm_class="icewmcontrolpanel",wm_name="IceWMControlPanel",widget=None,ok_button_title=None,cancel_button_title=None):
+		global ICEWMCP_FILE_WIN
+		global ICEWMCP_FILE_WIN_KEY
+		global ICEWMCP_FILE_WIN_OK
+		win_key=(wm_class,wm_name,ok_button_title,cancel_button_title)
+		if ICEWMCP_FILE_WIN==None or not ICEWMCP_FILE_WIN_KEY==win_key:
+			if not ICEWMCP_FILE_WIN==None: ICEWMCP_FILE_WIN.destroy()
+			ICEWMCP_FILE_WIN = buildFileSelector(title,wm_class,wm_name,ok_button_title,cancel_button_title)
+			ICEWMCP_FILE_WIN_KEY=win_key
+			ICEWMCP_FILE_WIN_OK=None
+		else:
+			ICEWMCP_FILE_WIN.set_title(title)
+		# only the current caller's callback may run on 'OK'
+		if not ICEWMCP_FILE_WIN_OK==None: ICEWMCP_FILE_WIN.ok_button.disconnect(ICEWMCP_FILE_WIN_OK)
+		ICEWMCP_FILE_WIN_OK=ICEWMCP_FILE_WIN.ok_button.connect('clicked', file_sel_cb)
+		value = ICEWMCP_LAST_FILE
+		if not widget==None: 
+			ICEWMCP_FILE_WIN.ok_button.set_data("cfg_path",widget.get_data("cfg_path"))
+			if value=='': value=widget.get_data("cfg_path").get_text()
+		else:
+			ICEWMCP_FILE_WIN.ok_button.set_data("cfg_path",None)
 
 		#     Changed 12.21.2003 to use error-catching AND check for a None value
 		#     for 'ICEWMCP_LAST_FILE' to fix BUG NUMBER: 6441772, 
@@ -1220,9 +1281,6 @@ def SELECT_A_FILE(file_sel_cb,title=FILE_SELECTOR_TITLE,wm_class="icewmcontrolpa
 		except:
 			pass
 		#print "Last File:  "+str(value)
-		ICEWMCP_FILE_WIN.set_data("ignore_return",1)
-		ICEWMCP_FILE_WIN.connect("key-press-event", keyPressClose)
-		ICEWMCP_FILE_WIN.set_modal(1)
 		ICEWMCP_FILE_WIN.show_all()
 
 # end - common file selection functionality
@@ -1230,20 +1288,21 @@ def SELECT_A_FILE(file_sel_cb,title=FILE_SELECTOR_TITLE,wm_class="icewmcontrolpa
 
 # added 8.25.20003, common code for getting a process ID
 def get_pidof(someapp):
+	# run pidof directly, without a /bin/sh in between
 	try:
-		fg=os.popen("pidof "+someapp)
-		ff=fg.readline().replace("\n","").replace("\t","").replace("\r","").strip()
-		fg.close()
-		if len(ff)>0: return ff		
-		return None
-	except:
+		ff=subprocess.Popen(["pidof",str(someapp)],stdout=subprocess.PIPE).communicate()[0]
+	except OSError:   # no 'pidof' on this system
 		return None
+	ff=" ".join(ff.split())
+	if len(ff)>0: return ff		
+	return None
 
 
 # Special fonts for special languages, 12.1.2003, Erica Andrews
+# (large font, small font) per locale; tuples, since nothing should change them
 special_fonts_map= {
-	"ru":["Arial 10","Arial 9"],
-	"zh_tw":["fixed 11","fixed 12"],
+	"ru":("Arial 10","Arial 9"),
+	"zh_tw":("fixed 11","fixed 12"),
 }
 
 
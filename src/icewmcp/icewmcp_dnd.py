@@ -45,7 +45,7 @@
 #	October/November 2003
 #############################
 
-import binascii
+import struct
 from icewmcp_common import *
 
 # drag-n-drop support, added 2.23.2003
@@ -72,15 +72,12 @@ def initColorDrag():   # mainly for IcePref2, IcePref-TD, and IceWMCPWallpaper -
 		if len(drago)==7: 
 			try:			
 				if str(drago[4].type)==str("application/x-color"):
-					# returns a string that looks something like 'ffffb9b9ffffffff'
-					rgbhex=binascii.hexlify(drago[4].data)
-					#print "rgbhex  " +rgbhex	
-					#print "len :  "+str(len(rgbhex))				
-					if not len(rgbhex)==16: return   # something weird happened
-					# translate to 6-char html-style color string like #FF00EE
-					rgbhex2="#"+rgbhex[2:4]+rgbhex[6:8]+rgbhex[10:12]
-					#print "rgb2  : "+rgbhex2
-					r,g,b=getRGBForHex(rgbhex2)  # from icewmcp_common
+					# 'application/x-color' is four 16-bit values (R,G,B,alpha) in the
+					# native byte order: keep the high byte of R, G and B
+					rgbdata=drago[4].data
+					if not len(rgbdata)==8: return   # something weird happened
+					r,g,b,alpha=struct.unpack("=HHHH",rgbdata)
+					r,g,b=r>>8,g>>8,b>>8
 					#print "Colors:  "+str(r) +"  "+str(g)+"  "+str(b)
 
 					# update the color on the 'color button' can called this drag-n-drop
@@ -54,9 +54,9 @@ except:
 
 # Some PyGtk2 path settings while we upgrade from PyGtk-1 to PyGtk2
 try:
-	import sys
-	sys.path=["/usr/lib/python2.2/site-packages/gtk-2.0"]+sys.path
-	sys.path=["/usr/lib/python2.3/site-packages/gtk-2.0"]+sys.path
+	import sys,os
+	# one insert, and only for the old paths that exist and are not there yet
+	sys.path[:0]=[ppath for ppath in ["/usr/lib/python2.3/site-packages/gtk-2.0","/usr/lib/python2.2/site-packages/gtk-2.0"] if os.path.isdir(ppath) and not ppath in sys.path]
 	import gtk
 	import gtk.gdk 
 	GDK=gtk.gdk
@@ -70,23 +70,19 @@ except:
 	pass
 
 
-import icewmcp_common,ICEWMCP_BugReport
+import icewmcp_common
 icewmcp_common.setSplash(icewmcp_common.getLocaleDir)
 icewmcp_common.showSplash(0)
-icewmcp_common.IS_STATIC_BINARY="yes"
-ICEWMCP_BugReport.IS_STATIC_BINARY="yes"
+icewmcp_common.IS_STATIC_BINARY="yes"   # ICEWMCP_BugReport picks this up when it is first imported
 icewmcp_common.NOSPLASH=1  # disable splash window from icepref_td
-while gtk.events_pending():
-	gtk.mainiteration()
+# let the splash window draw, but never spin here for good if something keeps queueing events
+for ii in range(64):
+	if not gtk.events_pending(): break
+	gtk.main_iteration_do(0)   # non-blocking
 
-import os,sys,IceWMCP,IceWMCPWinOptions,IceWMCPMouse,IceWMCPKeyboard,IceWMCPWallpaper,IceMe,phrozenclock,icepref,pyspool,icesound,icepref_td,IceWMCPGtkIconSelection,IceWMCP_GtkPCCard,IceWMCPEnergyStar
-
-global HW_SUPPORT
-try:
-	import IceWMCPSystem
-	HW_SUPPORT=1
-except:
-	HW_SUPPORT=0
+# Only the module asked for on the command line is imported.  The imports
+# stay literal 'import' statements so the static binary build still finds
+# every module.
 
 
 if __name__== "__main__" :
@@ -94,25 +90,55 @@ if __name__== "__main__" :
 	mods.sort()
 	if len(sys.argv)>1:
 		ar=sys.argv[1]
-		if ar=="IceWMCP.py": IceWMCP.run(1)
-		if ar=="IceWMCPWinOptions.py": IceWMCPWinOptions.run()
-		if ar=="IceMe.py": 
+		if ar=="IceWMCP.py": 
+			import IceWMCP
+			IceWMCP.run(1)
+		elif ar=="IceWMCPWinOptions.py": 
+			import IceWMCPWinOptions
+			IceWMCPWinOptions.run()
+		elif ar=="IceMe.py": 
+			import IceMe
 			icewmcp_common.hideSplash()
 			IceMe.main()
-		if ar=="IceWMCPMouse.py": IceWMCPMouse.run()
-		if ar=="IceWMCPKeyboard.py": IceWMCPKeyboard.run()
-		if ar=="IceWMCPWallpaper.py": IceWMCPWallpaper.run()
-		if ar=="icepref.py": 
+		elif ar=="IceWMCPMouse.py": 
+			import IceWMCPMouse
+			IceWMCPMouse.run()
+		elif ar=="IceWMCPKeyboard.py": 
+			import IceWMCPKeyboard
+			IceWMCPKeyboard.run()
+		elif ar=="IceWMCPWallpaper.py": 
+			import IceWMCPWallpaper
+			IceWMCPWallpaper.run()
+		elif ar=="icepref.py": 
+			import icepref
 			icepref.run()
-		if ar=="IceWMCPEnergyStar.py": IceWMCPEnergyStar.run()
-		if ar=="icesound.py": icesound.run()
-		if ar=="pyspool.py": pyspool.run()
-		if ar=="phrozenclock.py": phrozenclock.run()
-		if ar=="icepref_td.py": 
+		elif ar=="IceWMCPEnergyStar.py": 
+			import IceWMCPEnergyStar
+			IceWMCPEnergyStar.run()
+		elif ar=="icesound.py": 
+			import icesound
+			icesound.run()
+		elif ar=="pyspool.py": 
+			import pyspool
+			pyspool.run()
+		elif ar=="phrozenclock.py": 
+			import phrozenclock
+			phrozenclock.run()
+		elif ar=="icepref_td.py": 
+			import icepref_td
 			icepref_td.run()
-		if ar=="IceWMCPGtkIconSelection.py": IceWMCPGtkIconSelection.run_icons()
-		if ar=="IceWMCP_GtkPCCard.py": IceWMCP_GtkPCCard.run()
-		if ar=="IceWMCPSystem.py": 
+		elif ar=="IceWMCPGtkIconSelection.py": 
+			import IceWMCPGtkIconSelection
+			IceWMCPGtkIconSelection.run_icons()
+		elif ar=="IceWMCP_GtkPCCard.py": 
+			import IceWMCP_GtkPCCard
+			IceWMCP_GtkPCCard.run()
+		elif ar=="IceWMCPSystem.py": 
+			try:
+				import IceWMCPSystem
+				HW_SUPPORT=1
+			except:
+				HW_SUPPORT=0
 			if HW_SUPPORT==1:
 				IceWMCPSystem.run()
 			else:
@@ -125,5 +151,6 @@ if __name__== "__main__" :
 				print "\t"+ii
 			print "\nUSAGE: "+sys.argv[0][0:sys.argv[0].rfind(os.sep)+1]+"icewmcp [module]\n\n"
 			sys.exit(0)
-	else: IceWMCP.run(1)
-	
\ No newline at end of file
+	else: 
+		import IceWMCP
+		IceWMCP.run(1)
@@ -81,8 +81,8 @@ except:
 	pass
 
 
-def get_pango_font_weight(some_val):
-	weights={
+# XLFD names for the Pango weights, widths and slants, built once
+PANGO_WEIGHTS={
 	pango.WEIGHT_BOLD: "bold",
 	pango.WEIGHT_HEAVY: "heavy", 
 	pango.WEIGHT_LIGHT: "thin",
@@ -90,13 +90,8 @@ def get_pango_font_weight(some_val):
 	pango.WEIGHT_ULTRABOLD: "ultrabold",
 	pango.WEIGHT_ULTRALIGHT:"ultralight"
 				}
-	if weights.has_key(some_val): 
-		return weights[some_val]
-	return "*"  # wildcard
-
 
-def get_pango_font_condense(some_val):
-	condense={
+PANGO_CONDENSE={
 	pango.STRETCH_CONDENSED: "condensed",
 	pango.STRETCH_EXPANDED: "expanded", 
 	pango.STRETCH_EXTRA_CONDENSED: "extracondensed", 
@@ -107,14 +102,24 @@ def get_pango_font_condense(some_val):
 	pango.STRETCH_ULTRA_CONDENSED: "ultracondensed",
 	pango.STRETCH_ULTRA_EXPANDED: "ultraexpanded",
 				}
-	if condense.has_key(some_val): 
-		return condense[some_val]
-	return "*"  # wildcard
+
+PANGO_STYLES={
+	pango.STYLE_OBLIQUE: "o",
+	pango.STYLE_ITALIC: "i",
+				}
+
+# the XLFD pango2XLFD() fills in: face, weight, slant, width, size (decipoints)
+XLFD_FORMAT="-*-%s-%s-%s-%s-*-*-%d-*-*-p-*-"+ASSUME_CHARSET
+
+def get_pango_font_weight(some_val):
+	return PANGO_WEIGHTS.get(some_val,"*")  # wildcard
+
+
+def get_pango_font_condense(some_val):
+	return PANGO_CONDENSE.get(some_val,"*")  # wildcard
 
 def get_pango_font_style(some_val):
-	if some_val==pango.STYLE_OBLIQUE: return "o"
-	if some_val==pango.STYLE_ITALIC: return "i"	
-	return "r"  #Normal
+	return PANGO_STYLES.get(some_val,"r")  #Normal
 
 def get_valid_pango_font_desc(mystr):
 	# added 12.13.2003, fixes the bug where the whole app crashed if an invalid font 
@@ -147,15 +152,16 @@ def pango2XLFD(pango_str):
 	weight=get_pango_font_weight(fontdesc.get_weight())
 	fsize=fontdesc.get_size()/1024
 	if fsize<1: fsize=1  # bug fix 12.19.2003, dont allow fonts sizes of '0' or less, EVER
-	fsize=str(fsize*10)
-	condense=get_pango_font_condense(fontdesc.get_stretch()).strip()
-	fstyle=get_pango_font_style(fontdesc.get_style()).strip()
+	condense=get_pango_font_condense(fontdesc.get_stretch())
+	fstyle=get_pango_font_style(fontdesc.get_style())
 	#now reconstruct an XLFD compatible string and hope for the best
-	fontval="-*-"+face+"-"+weight+"-"+fstyle+"-"+condense+"-*-*-"+fsize+"-*-*-p-*-"+str(ASSUME_CHARSET)
+	fontval=XLFD_FORMAT % (face,weight,fstyle,condense,fsize*10)
 	return fontval.lower().strip()
     except:
 	return pango_str
 
+XLFD_SLANTS={"i":" italic", "o":" oblique"}
+
 def XLFD2pango(xlfd_str):
     try:
 	mystr=xlfd_str
@@ -164,43 +170,34 @@ def XLFD2pango(xlfd_str):
 	# to something like "courier medium 14", it's imperfect but works for most fonts
 	valls=mystr.split("-")
 	if len(valls)<9: return mystr  # something odd or incomplete
-	face=valls[2].strip()
-	weight="medium"
-	if not valls[3].strip()=="*": 
-		weight=valls[3].strip()
-	fsize=valls[8].strip()
+	# each field we need is stripped once: face, weight, slant, width, point size
+	face,weight,slant,setwidth,fsize=[ii.strip() for ii in (valls[2],valls[3],valls[4],valls[5],valls[8])]
+	if weight=="*": weight="medium"
 
 	# bug fix 12.19.2003, make sure 'fsize' is a valid integer and is greater than 0
 	try:
-		if int(fsize)>1: 
-			if int(fsize)<21: 
-				# bug fix 12.19.2003, allow for mal-formed 
-				# font sizes like '13' instead of '130', '6' instead of '60' etc.
-				fsize=fsize+"0"     # add the necessary '0'
-
-		if int(fsize)<1: 
+		isize=int(fsize)
+		if 1<isize<21: 
+			# bug fix 12.19.2003, allow for mal-formed 
+			# font sizes like '13' instead of '130', '6' instead of '60' etc.
+			isize=isize*10
+		if isize<1: 
 			# bug fix 12.19.2003, make sure 'fsize' is greater than 0
-			fsize="100"
-	except:
-		fsize="100"  # VERY malformed, not even an integer, default to a 10 pt font
+			isize=100
+	except ValueError:
+		isize=100  # VERY malformed, not even an integer, default to a 10 pt font
 
-	fsize=str(int(fsize.strip())/10)  # convert sizes like '130' to '13'
-
-	if int(fsize)<1: # bug fix 12.19.2003, make sure 'fsize' is greater than 0
-		fsize="10"  # cant allow a font of size less than 1, fall back to 10 pt
+	isize=isize/10  # convert sizes like '130' to '13'
+	if isize<1: # bug fix 12.19.2003, make sure 'fsize' is greater than 0
+		isize=10  # cant allow a font of size less than 1, fall back to 10 pt
 
+	fstyle=XLFD_SLANTS.get(slant,"")
 	condense=""
-	fstyle=""
-	if valls[4].strip()=="i": 
-		fstyle=" italic "
-	if valls[4].strip()=="o": 
-		fstyle=" oblique "
-	if not valls[5].strip()=="*": 
-		if not valls[5].lower().strip()=="normal":  
-			if not valls[5].lower().strip()=="regular":  
-				condense=valls[5].strip()+" "
-	fontval=face+", "+weight+fstyle+" "+condense+fsize
-	return get_valid_pango_font_desc(fontval.lower().replace("*","").replace("  "," ").strip())
+	if not setwidth=="*" and not setwidth.lower() in ("normal","regular"):
+		condense=" "+setwidth
+	# the pieces carry their own leading spaces, so no double-space cleanup is needed
+	fontval=face+", "+weight+fstyle+condense+" "+str(isize)
+	return get_valid_pango_font_desc(fontval.lower().replace("*","").strip())
     except:
 	return get_valid_pango_font_desc(xlfd_str)
 
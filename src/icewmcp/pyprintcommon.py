@@ -44,6 +44,8 @@
 #	02111-1307, USA.
 #############################################
 
+import re, shlex, subprocess
+
 #set translation support
 from icewmcp_common import *
 
@@ -72,31 +74,39 @@ def showConfirm(message_text,wintitle="PyPrint"):
 def showAbout(message_text,myappname="PyPrint"):
 	showHelp(str(myappname)+" "+PYPRINT_VERSION+"\n\nCopyright (c) 2002-2004 Erica Andrews\nPhrozenSmoke [at] yahoo.com\n"+_("All rights reserved.")+"\n\n" +str(message_text) +"\n\n"+str(myappname)+_(" is open source under the General Public License (GPL).\nNO technical support will be provided for this application.\nEnjoy!"),_("About ")+" "+myappname)
 
-def readOSLines(os_popen_cmd):
+def iterOSLines(os_popen_cmd):
+	# run the command directly, without a /bin/sh in between, and hand
+	# back its output a line at a time as the command writes it
 	try:
-		return list(os.popen(str(os_popen_cmd)).xreadlines())
-	except:
-		return []
+		proc=subprocess.Popen(shlex.split(str(os_popen_cmd)),stdout=subprocess.PIPE)
+	except (OSError, ValueError):   # no such program, bad quoting
+		return
+	for pline in iter(proc.stdout.readline,""):
+		yield pline
+	proc.stdout.close()
+	proc.wait()
+
+def readOSLines(os_popen_cmd):
+	return list(iterOSLines(os_popen_cmd))
+
+# the printer name sits between 'system for' and the first ':' of an 'lpstat -v' line
+PRINTER_NAME_RE=re.compile(r"^[^:]*?system for([^:]*):")
 
 def getPrinterNames() :
-	xlines=readOSLines("lpstat -v")
 	printers=[]
-	for pp in xlines:
-		pline=pp.strip()
-		if pline.find("system for") > -1:
-			if pline.find(":")> pline.find("system for"):
-				printer_name=pline[pline.find("system for")+len("system for"):pline.find(":")].strip()
-				if not printer_name=="all": printers.append(printer_name)
+	for pp in iterOSLines("lpstat -v"):   # no list of every line first
+		pmatch=PRINTER_NAME_RE.match(pp)
+		if pmatch:
+			printer_name=pmatch.group(1).strip()
+			if not printer_name=="all": printers.append(printer_name)
 	return printers
 
 def isOnPath(binary):
-  if os.environ.has_key("PATH"):
-    paths=os.environ["PATH"].split(":")
-    for i in paths:
-      p=i
-      if not p.endswith("/"): p=p+"/"
-      if os.path.exists(p+str(binary)):
-        return 1
+  # like 'which': the file has to be executable, and the first hit wins
+  for i in os.environ.get("PATH","").split(os.pathsep):
+    p=os.path.join(i or os.curdir,str(binary))
+    if os.path.isfile(p) and os.access(p,os.X_OK):
+      return 1
   return 0
 
 